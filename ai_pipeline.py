@@ -0,0 +1,319 @@
+import asyncio
+import difflib
+import threading
+import time
+
+import intent
+from reaction import call_synth_llm
+
+GREETING = "Entering AI mode. Please describe the sound you want to create."
+THINKING = "AI starts thinking."
+PREVIEW = "Here is the sound:"
+
+class Speculator:
+    """
+    Speculative LLM requests from the partial transcript of one utterance.
+    While the user is speaking (or in the silence timeout after), a request
+    is started as soon as the partial text has not changed for `stable`
+    seconds. The final transcript then takes the request whose text matches
+    it (word-level difflib ratio >= `match`, same parameters); the others are
+    cancelled. `inflight` (shared across turns) bounds how many run at a time.
+    With a grammar recognizer the open-vocabulary partial (stt.open_partial)
+    is watched, since that is the text a descriptive request ends up as.
+    """
+    def __init__(self, pipeline, inflight, stable=0.3, min_words=2, match=0.9, poll=0.05):
+        self.pipeline = pipeline
+        self.inflight = inflight
+        self.stable = stable
+        self.min_words = min_words
+        self.match = match
+        self.poll = poll
+        self.requests = []   # (tokens, params, task, cancel event)
+
+    async def watch(self, stt):
+        """Poll the partial transcript until cancelled, issuing requests as it stabilizes."""
+        last, since, issued = "", time.perf_counter(), ""
+        while True:
+            await asyncio.sleep(self.poll)
+            text = getattr(stt, "open_partial", None) or getattr(stt, "partial", "")
+            now = time.perf_counter()
+            if text != last:
+                last, since = text, now
+                continue
+            if text == issued or now - since < self.stable:
+                continue
+            issued = text
+            if "[unk]" in text:
+                # words the recognizer could not place: never matches the final text
+                continue
+            if len(intent.tokenize(text)) < self.min_words or intent.parse(text) is not None:
+                # too short yet, or an edit the intent parser handles without the LLM
+                continue
+            if not self.inflight.acquire(blocking=False):
+                continue
+            params = self.pipeline.sound.get_current_params()
+            cancel = threading.Event()
+            # whichever side takes `claim` gives the permit back: the worker
+            # thread, or the done callback if the task never reached it
+            claim = threading.Lock()
+            print(f"Speculative LLM request for '{text}'")
+            task = asyncio.create_task(asyncio.to_thread(self._request, text, params, cancel, claim))
+            task.add_done_callback(lambda _, claim=claim: self._release(claim))
+            self.requests.append((intent.tokenize(text), params, task, cancel))
+            self.pipeline.speculation["issued"] += 1
+
+    def _release(self, claim):
+        if claim.acquire(blocking=False):
+            self.inflight.release()
+
+    def _request(self, text, params, cancel, claim):
+        if not claim.acquire(blocking=False):
+            return {"exit": 0, "description": "", "channels": [], "error": "cancelled"}
+        try:
+            return call_synth_llm(self.pipeline.llm, text, params, self.pipeline.cache, abort=cancel)
+        finally:
+            self.inflight.release()
+
+    def take(self, final):
+        """The request task matching the final transcript, or None; the rest are cancelled."""
+        words = intent.tokenize(final)
+        params = self.pipeline.sound.get_current_params()
+        best, best_ratio = None, self.match
+        for tokens, sent_params, task, _ in self.requests:
+            ratio = difflib.SequenceMatcher(None, tokens, words).ratio()
+            if ratio >= best_ratio and sent_params == params:
+                best, best_ratio = task, ratio
+        for _, _, task, cancel in self.requests:
+            if task is not best:
+                cancel.set()
+                task.cancel()
+                self.pipeline.speculation["discarded"] += 1
+        self.requests = []
+        return best
+
+class AIPipeline:
+    """
+    One AI-mode session as an explicit asyncio stage graph:
+
+        listen ──> reason ──┬──> LLM request (streamed) ──> apply channels
+                            └──> status speech ──> description speech
+                 ──> preview ──> listen ...
+
+    Simple edits ("more reverb on the saw", "I'm done") are handled by the
+    local intent parser and skip the LLM. Otherwise the LLM request runs while
+    the status phrase is spoken, and the description is spoken as soon as it
+    streams in. Every stage is a task that is cancelled the moment `abort` is
+    set; per-stage timings are kept in `timings`.
+
+    "Undo" and "redo" step through `history` (a history.PresetHistory), and
+    "something similar" loads the closest preset from `library` (a
+    presets.PresetLibrary).
+
+    With `speculate`, a Speculator starts the LLM request from the partial
+    transcript while the user is still talking, at most `max_inflight`
+    requests at a time.
+    """
+    def __init__(self, sound, llm, stt, tts, abort, cache=None,
+                 on_state=None, apply_channel=None, on_response=None,
+                 speculate=True, max_inflight=2, history=None, library=None):
+        self.sound = sound
+        self.llm = llm
+        self.stt = stt
+        self.tts = tts
+        self.abort = abort
+        self.cache = cache
+        self.on_state = on_state or (lambda state: None)
+        self.apply_channel = apply_channel
+        self.on_response = on_response
+        self.history = history
+        self.library = library
+        self.timings = []
+        self.turns = 0
+        self.local_turns = 0
+        self.speculate = speculate
+        self._inflight = threading.BoundedSemaphore(max_inflight)
+        self.speculation = {"issued": 0, "used": 0, "discarded": 0}
+
+    def run(self):
+        """Run the session on the calling (AI) thread until exit or abort."""
+        asyncio.run(self._session())
+
+    async def _session(self):
+        session = asyncio.current_task()
+        watcher = asyncio.create_task(self._watch_abort(session))
+        try:
+            await self.tts.speak_async(GREETING)
+            while not self.abort.is_set():
+                if not await self._turn():
+                    break
+        except asyncio.CancelledError:
+            print("AI session aborted")
+        finally:
+            watcher.cancel()
+            if self.turns:
+                print(f"Turns handled locally: {self.local_turns}/{self.turns} "
+                      f"({self.local_turns / self.turns:.0%})")
+            if self.speculation["issued"]:
+                print("Speculative LLM requests:", self.speculation)
+
+    async def _watch_abort(self, session):
+        while not self.abort.is_set():
+            await asyncio.sleep(0.02)
+        session.cancel()
+
+    async def _timed(self, timing, name, aw):
+        t0 = time.perf_counter()
+        try:
+            return await aw
+        finally:
+            timing[name] = time.perf_counter() - t0
+
+    async def _turn(self):
+        """One listen/reason/speak/preview cycle; returns False when the user asks to exit."""
+        timing = {}
+        t0 = time.perf_counter()
+
+        # listen, once the recognizer has finished loading
+        ready = getattr(self.stt, "ready", None)
+        if ready is not None and not ready.is_set():
+            self.on_state("loading")
+            await asyncio.to_thread(self.stt.load)
+        self.on_state("listen")
+        speculator = Speculator(self, self._inflight) if self.speculate else None
+        watcher = asyncio.create_task(speculator.watch(self.stt)) if speculator else None
+        try:
+            user_text = await self._timed(timing, "listen",
+                                          asyncio.to_thread(self.stt.record_and_transcribe, self.abort))
+        except asyncio.CancelledError:
+            if speculator is not None:
+                speculator.take("")
+            raise
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+        print(f"📝 Transcription result: '{user_text}'")
+        speculative = speculator.take(user_text) if speculator else None
+
+        self.turns += 1
+        edit = intent.parse(user_text)
+        if edit is not None:
+            self.local_turns += 1
+            print(f"Handled locally: {edit} ({self.local_turns}/{self.turns} turns local)")
+            if speculative is not None:
+                speculative.cancel()
+                self.speculation["discarded"] += 1
+            resp = await asyncio.to_thread(intent.apply, edit, self.sound, self.history, self.library)
+            if self.on_response is not None:
+                await asyncio.to_thread(self.on_response, resp)
+            if resp["exit"] == 1:
+                await self.tts.speak_async(f"{resp['description']}. Exiting AI mode")
+                return False
+            self.on_state("speak")
+            await self._timed(timing, "description_speech", self.tts.speak_async(resp["description"]))
+        elif not await self._reason(timing, user_text, t0, speculative):
+            return False
+
+        # preview
+        self.on_state("preview")
+        t_preview = time.perf_counter()
+        await self.tts.speak_async(PREVIEW)
+        await asyncio.sleep(0.5)
+        self.sound.note_on()
+        try:
+            await asyncio.sleep(2)
+        finally:
+            self.sound.note_off()
+        await asyncio.sleep(3)
+        timing["preview"] = time.perf_counter() - t_preview
+
+        timing["total"] = time.perf_counter() - t0
+        self.timings.append(timing)
+        print("AI turn timings (s):", {k: round(v, 2) for k, v in timing.items()})
+        return True
+
+    async def _reason(self, timing, user_text, t0, speculative=None):
+        """
+        Ask the LLM and speak its description; returns False when it asks to exit.
+        speculative: a Speculator request task for this transcript, used instead
+        of a new request unless it failed.
+        """
+        loop = asyncio.get_running_loop()
+
+        # reason: LLM request and status speech run side by side
+        self.on_state("reasoning")
+        streamed = {}
+        description = loop.create_future()
+
+        def on_field(key, value):
+            # called from the LLM worker thread
+            if self.abort.is_set():
+                return
+            streamed[key] = value
+            if key == "description":
+                loop.call_soon_threadsafe(_resolve, description, value)
+
+        def on_channel(i, ch_conf):
+            if self.abort.is_set() or streamed.get("exit", 0) == 1:
+                return
+            if self.apply_channel is not None:
+                self.apply_channel(ch_conf)
+
+        status = asyncio.create_task(self._timed(timing, "status_speech", self.tts.speak_async(THINKING)))
+        request = asyncio.create_task(self._timed(timing, "llm", self._request(
+            user_text, speculative, on_field, on_channel)))
+        speech = asyncio.create_task(self._speak_description(timing, status, description, streamed))
+        try:
+            resp = await request
+            timing["reason"] = time.perf_counter() - t0 - timing["listen"]
+            _resolve(description, resp.get("description", ""))
+            if self.cache is not None:
+                print("LLM cache:", self.cache.stats())
+            if self.on_response is not None:
+                await asyncio.to_thread(self.on_response, resp)
+
+            if resp.get("exit", 1) == 1:
+                # user wants to quit AI mode
+                await status
+                await self.tts.speak_async(f'''{resp.get("description", "")}. Exiting AI mode''')
+                print("LLM returned exit=1, quitting AI mode")
+                speech.cancel()
+                return False
+
+            self.on_state("speak")
+            await speech
+        except asyncio.CancelledError:
+            for task in (status, request, speech):
+                task.cancel()
+            raise
+        return True
+
+    async def _request(self, user_text, speculative, on_field, on_channel):
+        """LLM response for user_text: the speculative one replayed through the callbacks, or a new call."""
+        if speculative is not None:
+            resp = await speculative
+            if "error" not in resp:
+                print("Using speculative LLM response")
+                self.speculation["used"] += 1
+                for i, conf in enumerate(resp.get("channels", [])):
+                    on_channel(i, conf)
+                for k, v in resp.items():
+                    on_field(k, v)
+                return resp
+            # the speculative call failed; ask again with the final text
+            self.speculation["discarded"] += 1
+        return await asyncio.to_thread(
+            call_synth_llm, self.llm, user_text, self.sound.get_current_params(), self.cache,
+            on_field, on_channel, self.abort)
+
+    async def _speak_description(self, timing, status, description, streamed):
+        """Speak the description once the status phrase is done and the text is known."""
+        await status
+        desc = await description
+        if streamed.get("exit", 0) == 1 or not desc:
+            return
+        print(f"LLM response description: {desc}")
+        await self._timed(timing, "description_speech", self.tts.speak_async(desc))
+
+def _resolve(future, value):
+    if not future.done():
+        future.set_result(value)
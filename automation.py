@@ -0,0 +1,147 @@
+import numpy as np
+
+from params import PARAMS
+
+# parameters interpolated per sample on playback; the rest change once per block
+PER_SAMPLE = {"vol": "volume", "wet": "wet"}
+
+class Lane:
+    """
+    Recorded moves of one (channel, parameter): a float64 time array (seconds
+    since the take started) and a float32 value array, grown by doubling.
+    """
+    def __init__(self, capacity=64):
+        self.t = np.empty(capacity, dtype=np.float64)
+        self.v = np.empty(capacity, dtype=np.float32)
+        self.n = 0
+
+    def add(self, t, v):
+        if self.n and t < self.t[self.n - 1]:
+            t = self.t[self.n - 1]   # keep times sorted for np.interp
+        if self.n == len(self.t):
+            self.t = np.concatenate((self.t, np.empty_like(self.t)))
+            self.v = np.concatenate((self.v, np.empty_like(self.v)))
+        self.t[self.n] = t
+        self.v[self.n] = v
+        self.n += 1
+
+    @property
+    def times(self):
+        return self.t[:self.n]
+
+    @property
+    def values(self):
+        return self.v[:self.n]
+
+    @property
+    def nbytes(self):
+        return self.t.nbytes + self.v.nbytes
+
+class Automation:
+    """
+    Parameter automation for a Sound: knob/touch moves recorded during a take
+    into one Lane per (channel, parameter index), then played back by
+    Sound.process(), once or in a loop of the take's length.
+
+    Playback positions are in rendered samples, so it is sample-accurate and
+    works the same in the audio callback and in an offline render (at any
+    sample rate). Volume and reverb wet are interpolated per sample and
+    handed to Channel.process(); the other parameters are set once per block
+    through sound.params. Moving a parameter by hand during playback takes
+    it out of the automation until the next take.
+
+    on_change: optional callable, called from render() (the audio thread)
+    after a block has changed stored values, e.g. to wake a redraw.
+    """
+    def __init__(self, on_change=None):
+        self.on_change = on_change
+        self.lanes = {}
+        self.length = 0.0       # seconds of the last take
+        self.recording = False
+        self.playing = False
+        self.loop = True
+        self.position = 0.0     # playback position in seconds
+        self._origin = 0.0      # sample clock (seconds) at the start of the take
+        self._overridden = set()
+
+    def copy(self):
+        """A stopped Automation with the same lanes and take length, e.g. for an offline render."""
+        take = Automation()
+        take.lanes = dict(self.lanes)
+        take.length = self.length
+        return take
+
+    def start_recording(self, sound):
+        """Start a new take; earlier lanes are dropped."""
+        self.playing = False
+        self.lanes = {}
+        self._overridden = set()
+        self._origin = sound.clock()
+        self.recording = True
+
+    def stop_recording(self, sound):
+        self.recording = False
+        self.length = max(sound.clock() - self._origin, 0.0)
+
+    def play(self, loop=True):
+        """Start playback of the recorded lanes from the top."""
+        self.position = 0.0
+        self.loop = loop
+        self.playing = bool(self.lanes) and self.length > 0
+
+    def stop(self):
+        self.playing = False
+
+    def record(self, sound, ch, i, value, t=None, previous=None):
+        """
+        A parameter move at monotonic time t (e.g. the knob sample time).
+        previous: the value before the move, held from the start of the take
+        up to the first move of a lane. During playback a move instead takes
+        the parameter out of the automation.
+        """
+        if not self.recording:
+            if self.playing:
+                self._overridden.add((ch, i))
+            return
+        at = sound.clock(t) - self._origin
+        lane = self.lanes.get((ch, i))
+        if lane is None:
+            lane = Lane()
+            if previous is not None:
+                lane.add(0.0, previous)
+                lane.add(max(at - 1 / sound.sr, 0.0), previous)
+            self.lanes[(ch, i)] = lane
+        lane.add(at, value)
+
+    def nbytes(self):
+        return sum(lane.nbytes for lane in self.lanes.values())
+
+    def render(self, sound, frames):
+        """
+        Advance playback by one block: block-rate lanes are applied through
+        sound.params, per-sample ones returned as {channel: {field: array}}.
+        """
+        t = self.position + np.arange(frames) / sound.sr
+        if self.loop:
+            t %= self.length
+        curves = {}
+        changed = False
+        for (ch, i), lane in list(self.lanes.items()):
+            if (ch, i) in self._overridden:
+                continue
+            key = PARAMS[i].key
+            if key in PER_SAMPLE:
+                values = np.interp(t, lane.times, lane.values)
+                curves.setdefault(ch, {})[PER_SAMPLE[key]] = values
+                # the stored value follows, for the display and after playback
+                changed |= sound.params.set(ch, i, float(values[-1]))
+            else:
+                changed |= sound.params.set(ch, i, float(np.interp(t[0], lane.times, lane.values)))
+        self.position += frames / sound.sr
+        if self.loop:
+            self.position %= self.length
+        elif self.position >= self.length:
+            self.playing = False
+        if changed and self.on_change is not None:
+            self.on_change()
+        return curves
@@ -1,5 +1,6 @@
+import copy
+
 import numpy as np
-import sounddevice as sd
 import time
 
 std_range = [0.0, 1.0]
@@ -21,40 +22,74 @@ class Channel:
         self.sr = sr
         self.volume = volume
         self.phase = 0
+        # parameter ranges live in params.PARAMS
 
-        self.vol_range = [0.0, 1.0]
-
-        self.env_att_range = [0.0, 1.0]
-        self.env_dec_range = [0.0, 1.0]
-        self.env_sus_range = [0.0, 1.0]
-        self.env_rel_range = [0.0, 1.0]
-
-        self.filter_l_range = [0.0, 1.0]
-        self.filter_m_range = [0.0, 1.0]
-        self.filter_h_range = [0.0, 1.0]
-        
-        self.rev_dec_range = [0.0, 1.0]
-        self.rev_del_range = [0.0, 0.2]
-        self.rev_wet_range = [0.0, 1.0]
+    def clone(self):
+        """
+        Independent copy sharing only the (read-only) waveform table; envelope
+        state, filter gains, reverb tail and phase carry over, so the copy
+        continues the sound exactly where this channel is.
+        """
+        twin = copy.copy(self)
+        twin.envelopes = [copy.copy(env) for env in self.envelopes]
+        twin.filters = [copy.copy(fl) for fl in self.filters]
+        twin.reverbs = [copy.copy(rv) for rv in self.reverbs]
+        for rv in twin.reverbs:
+            rv.buffer = rv.buffer.copy()
+        return twin
+
+    def follow(self, other):
+        """
+        Take over the running state of `other`, the channel this one replaces:
+        envelope stage and level, oscillator phase and reverb tail, as they
+        are now rather than when this channel was cloned.
+        """
+        for env, src in zip(self.envelopes, other.envelopes):
+            env.state, env.progress, env.current_amp = src.state, src.progress, src.current_amp
+            if hasattr(src, 'start_amp'):
+                env.start_amp = src.start_amp
+        for rv, src in zip(self.reverbs, other.reverbs):
+            rv.buffer = src.buffer.copy()
+        if self.waveform.length == other.waveform.length:
+            self.phase = other.phase
+        else:
+            self.phase = int(other.phase / other.waveform.length * self.waveform.length)
 
-    def process(self, frames):
-        """Generate a mono buffer for this channel."""
-        ar = np.arange(frames)
-        idx = (self.phase + ar) % self.waveform.length
-        sig = self.waveform.data[idx].copy()
+    def process(self, frames, volume=None, wet=None, pitch=None,
+                low=None, mid=None, high=None, decay=None, delay=None):
+        """
+        Generate a mono buffer for this channel.
+        volume, wet: optional per-sample arrays used instead of the stored values
+        pitch: optional per-sample offset in semitones (read with a fractional phase)
+        low, mid, high, decay, delay: optional values for this block only
+        """
+        length = self.waveform.length
+        if pitch is None:
+            idx = (int(self.phase) + np.arange(frames)) % length
+            sig = self.waveform.data[idx].copy()
+            advance = frames
+        else:
+            # fractional read position, linearly interpolated in the table
+            step = 2.0 ** (np.asarray(pitch) / 12.0)
+            pos = self.phase + np.cumsum(step) - step
+            i0 = pos.astype(np.int64) % length
+            frac = (pos - np.floor(pos)).astype('float32')
+            data = self.waveform.data
+            sig = data[i0] * (1 - frac) + data[(i0 + 1) % length] * frac
+            advance = pos[-1] + step[-1] - self.phase
 
         # Apply ADSR envelope
         for env in self.envelopes:
             sig *= env.process(frames)
         # Apply filters
         for fl in self.filters:
-            sig = fl.apply(sig)
+            sig = fl.apply(sig, low, mid, high)
         # Apply reverbs
         for rv in self.reverbs:
-            sig = rv.apply(sig)
+            sig = rv.apply(sig, wet, decay, delay)
 
-        sig *= self.volume
-        self.phase = (self.phase + frames) % self.waveform.length
+        sig *= self.volume if volume is None else volume
+        self.phase = (self.phase + advance) % length
         return sig
 
 class Waveform:
@@ -79,8 +114,9 @@ class Waveform:
             raise ValueError(f"Unknown waveform '{name}'")
 
 class Envelope:
-    def __init__(self, sr=44100, attack=0.2, decay=0.3, sustain=0.5, release=0.4):
+    def __init__(self, sr=44100, attack=0.2, decay=0.3, sustain=0.5, release=0.4, quiet=False):
         self.sr = sr
+        self.quiet = quiet   # no per-block state print (offline renders)
         self.attack_time = attack
         self.decay_time = decay
         self.sustain_level = sustain
@@ -115,8 +151,6 @@ class Envelope:
         if self.state == 'idle':
             return env
 
-        self.update_samples()
-
         for i in range(frames):
             if self.state == 'attack':
                 self.progress += 1.0 / self.a_samps
@@ -144,7 +178,8 @@ class Envelope:
             else:
                 env[i] = 0.0
 
-        print(f"\rState: {self.state}\t, Progress: {self.progress:.4f}, Current Amp: {self.current_amp:.4f}", end="")
+        if not self.quiet:
+            print(f"\rState: {self.state}\t, Progress: {self.progress:.4f}, Current Amp: {self.current_amp:.4f}", end="")
 
         return env
 
@@ -155,14 +190,32 @@ class Filter:
         self.mid = mid
         self.high = high
         self.sr = sr
-
-    def apply(self, signal):
-        """Apply band-specific gains."""
+        self.n = 0
+        self.gains = None
+
+    def update_gains(self, n=None):
+        """Recompute the per-bin gain vector; called when a band gain or the block size changes."""
+        n = n or self.n
+        if not n:
+            return
+        self.freqs = np.fft.rfftfreq(n, d=1/self.sr)
+        self.gains = self.band_gains(self.low, self.mid, self.high)
+        self.n = n
+
+    def band_gains(self, low, mid, high):
+        return np.where(self.freqs < 400, low, np.where(self.freqs < 4000, mid, high))
+
+    def apply(self, signal, low=None, mid=None, high=None):
+        """Apply band-specific gains; low/mid/high override the stored bands for this block."""
+        if len(signal) != self.n:
+            self.update_gains(len(signal))
+        gains = self.gains
+        if low is not None or mid is not None or high is not None:
+            gains = self.band_gains(self.low if low is None else low,
+                                    self.mid if mid is None else mid,
+                                    self.high if high is None else high)
         fft = np.fft.rfft(signal)
-        freqs = np.fft.rfftfreq(len(signal), d=1/self.sr)
-        fft[freqs < 400] *= self.low
-        fft[(freqs >= 400) & (freqs < 4000)] *= self.mid
-        fft[freqs >= 4000] *= self.high
+        fft *= gains
         return np.fft.irfft(fft, n=len(signal))
 
 class Reverb:
@@ -174,9 +227,10 @@ class Reverb:
         self.sr = sr
         self.buffer = np.zeros(sr // 2)
 
-    def apply(self, signal):
+    def apply(self, signal, wet=None, decay=None, delay=None):
         out = np.copy(signal)
-        d_samp = int(self.delay * self.sr)
+        decay = self.decay if decay is None else decay
+        d_samp = int((self.delay if delay is None else delay) * self.sr)
 
         for i in range(1, self.reflections + 1):
             idx = d_samp * i
@@ -190,7 +244,7 @@ class Reverb:
             real_idx = max(0, idx + random_offset)
 
             if real_idx < len(signal):
-                out[real_idx:] += signal[:-real_idx] * (self.decay ** i) * 2.0
+                out[real_idx:] += signal[:-real_idx] * (decay ** i) * 2.0
 
         buffer_len = len(self.buffer)
         min_len = min(buffer_len, len(out))
@@ -200,4 +254,5 @@ class Reverb:
         self.buffer = np.roll(self.buffer, -len(signal))
         self.buffer[-len(signal):] = out
 
-        return (1.0 - self.wet) * signal + self.wet * out
\ No newline at end of file
+        wet = self.wet if wet is None else wet
+        return (1.0 - wet) * signal + wet * out
\ No newline at end of file
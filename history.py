@@ -0,0 +1,140 @@
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+class PresetHistory:
+    """
+    Append-only preset history in a JSON-lines file, one
+    {"time", "description", "channels"} object per line.
+
+    A background writer thread appends the lines, so callers never wait on
+    the disk. Next to the log, `<path>.idx` holds the undo cursor and the
+    byte offset of every entry on the current timeline. The index is
+    replaced atomically (temp file + os.replace) after each batch of writes, so
+    get(n) is one seek and one line read. Undo/redo move the cursor; a
+    new entry after an undo starts a new timeline, but the log keeps every
+    line ever written.
+    """
+    def __init__(self, path="history.jsonl", seed=None):
+        """seed: optional preset JSON file (e.g. last_preset.json) imported when the history is empty"""
+        self.path = path
+        self.index_path = path + ".idx"
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue()
+        open(path, "ab").close()
+        self.offsets, self.cursor = self._load_index()
+        self._reader = open(path, "rb")
+        self._writer = open(path, "ab")
+        threading.Thread(target=self._write_loop, daemon=True).start()
+        if not self.offsets and seed and os.path.exists(seed):
+            with open(seed) as f:
+                data = json.load(f)
+            if data.get("channels"):
+                self.append(data["channels"], data.get("description", ""))
+
+    def _load_index(self):
+        """(offsets, cursor) from the index file, re-scanning the log past its last entry."""
+        offsets, cursor = [], -1
+        try:
+            arr = np.load(self.index_path)
+            cursor, offsets = int(arr[0]), arr[1:].tolist()
+        except (OSError, ValueError, IndexError):
+            pass
+        size = os.path.getsize(self.path)
+        if offsets and offsets[-1] >= size:
+            # log truncated behind the index's back: rebuild from scratch
+            offsets, cursor = [], -1
+        # lines appended after the index was last written (e.g. a crash in between)
+        with open(self.path, "rb") as f:
+            if offsets:
+                f.seek(offsets[-1])
+                f.readline()
+            pos = f.tell()
+            for line in f:
+                if line.endswith(b"\n"):
+                    offsets.append(pos)
+                    cursor = len(offsets) - 1
+                pos += len(line)
+        return offsets, min(cursor, len(offsets) - 1)
+
+    def _write_loop(self):
+        while True:
+            # everything queued so far goes out with one index update
+            jobs = [self._jobs.get()]
+            while not self._jobs.empty():
+                jobs.append(self._jobs.get_nowait())
+            try:
+                for job in jobs:
+                    if job is not None:
+                        self._write(job)
+                self._save_index()
+            finally:
+                for _ in jobs:
+                    self._jobs.task_done()
+
+    def _write(self, entry):
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+        offset = self._writer.seek(0, os.SEEK_END)
+        self._writer.write(line)
+        self._writer.flush()
+        with self._lock:
+            # a new entry drops the redo branch from the timeline
+            del self.offsets[self.cursor + 1:]
+            self.offsets.append(offset)
+            self.cursor = len(self.offsets) - 1
+
+    def _save_index(self):
+        with self._lock:
+            arr = np.array([self.cursor] + self.offsets, dtype=np.int64)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, arr)
+        os.replace(tmp, self.index_path)
+
+    def __len__(self):
+        self.flush()
+        return len(self.offsets)
+
+    def flush(self):
+        """Wait until every queued write is on disk."""
+        self._jobs.join()
+
+    def append(self, channels, description=""):
+        """Queue a preset for the background writer; it becomes the current entry."""
+        self._jobs.put({"time": time.time(), "description": description, "channels": channels})
+
+    def get(self, n):
+        """Entry n of the current timeline (negative counts from the end), or None."""
+        self.flush()
+        with self._lock:
+            if not -len(self.offsets) <= n < len(self.offsets):
+                return None
+            self._reader.seek(self.offsets[n])
+            return json.loads(self._reader.readline())
+
+    def current(self):
+        """The entry at the undo cursor: the preset to restore at startup."""
+        self.flush()
+        return self.get(self.cursor) if self.cursor >= 0 else None
+
+    def _move(self, step):
+        self.flush()
+        with self._lock:
+            target = self.cursor + step
+            if not 0 <= target < len(self.offsets):
+                return None
+            self.cursor = target
+        self._jobs.put(None)   # persist the cursor
+        return self.get(target)
+
+    def undo(self):
+        """Step back to the previous entry and return it; None at the start."""
+        return self._move(-1)
+
+    def redo(self):
+        """Step forward again after undo(); None at the end of the timeline."""
+        return self._move(1)
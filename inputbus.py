@@ -0,0 +1,113 @@
+import queue
+import threading
+import time
+from collections import namedtuple, deque
+
+import numpy as np
+
+# t is time.monotonic() at the moment the event reached the bus (or its producer)
+InputEvent = namedtuple("InputEvent", "t source value")
+
+class InputBus:
+    """
+    Single entry point for GPIO, knob and touch input.
+    post() timestamps and queues an event without blocking the producer thread;
+    one dispatcher thread debounces in software and runs the registered handler,
+    so all input-driven state changes happen on that thread.
+
+    Debouncing never sleeps:
+    - press sources accept the first edge and drop the rest of the window;
+    - level sources (level=True) also remember the last edge seen inside the
+      window and apply it when the window closes if it changed the level.
+    """
+    def __init__(self, latency_window=256):
+        self.queue = queue.SimpleQueue()
+        self.handlers = {}
+        self._last = {}       # source -> last accepted InputEvent
+        self._pending = {}    # source -> trailing edge waiting for its window to close
+        self.latency = deque(maxlen=latency_window)
+        self.dropped = 0
+        self.shutdown = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def register(self, source, handler, debounce=0.0, level=False):
+        self.handlers[source] = (handler, debounce, level)
+
+    def post(self, source, value=None, t=None):
+        """Queue an event from any thread; t defaults to now."""
+        self.queue.put(InputEvent(time.monotonic() if t is None else t, source, value))
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.shutdown.set()
+        self.queue.put(None)
+
+    def _apply(self, ev, handler):
+        self._last[ev.source] = ev
+        try:
+            handler(ev)
+        except Exception as e:
+            print(f"Input handler for {ev.source} failed:", e)
+        self.latency.append(time.monotonic() - ev.t)
+
+    def _offer(self, ev):
+        entry = self.handlers.get(ev.source)
+        if entry is None:
+            return
+        handler, debounce, level = entry
+        last = self._last.get(ev.source)
+        if last is not None and ev.t - last.t < debounce:
+            if level:
+                self._pending[ev.source] = ev
+            else:
+                self.dropped += 1
+            return
+        self._pending.pop(ev.source, None)
+        if level and last is not None and ev.value == last.value:
+            self.dropped += 1
+            return
+        self._apply(ev, handler)
+
+    def _flush_pending(self, now):
+        """Apply trailing edges whose debounce window has closed; returns the next deadline."""
+        next_deadline = None
+        for source, ev in list(self._pending.items()):
+            handler, debounce, _ = self.handlers[source]
+            deadline = self._last[source].t + debounce
+            if now < deadline:
+                next_deadline = deadline if next_deadline is None else min(next_deadline, deadline)
+                continue
+            del self._pending[source]
+            if ev.value != self._last[source].value:
+                self._apply(ev, handler)
+            else:
+                self.dropped += 1
+        return next_deadline
+
+    def _run(self):
+        next_deadline = None
+        while not self.shutdown.is_set():
+            timeout = None if next_deadline is None else max(next_deadline - time.monotonic(), 0.0)
+            try:
+                ev = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                ev = None
+            if ev is not None:
+                self._offer(ev)
+            next_deadline = self._flush_pending(time.monotonic())
+
+    def latency_stats(self):
+        """Input-to-action latency over the recent window, in milliseconds."""
+        if not self.latency:
+            return {}
+        ms = np.array(self.latency) * 1000.0
+        return {
+            "count": len(ms),
+            "mean": float(ms.mean()),
+            "p50": float(np.percentile(ms, 50)),
+            "p95": float(np.percentile(ms, 95)),
+            "max": float(ms.max()),
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,229 @@
+import re
+from collections import namedtuple
+
+from params import PARAMS, PARAM_INDEX, WAVE_NAMES
+from vocab import WAVE_WORDS, PARAM_WORDS, NUMBER_WORDS, synth_words
+
+# A simple edit recognized without the LLM.
+#   kind:     "edit", "exit", "undo", "redo" or "similar"
+#   channels: channel indices to change, None = the audible ones
+#   param:    PARAMS key, or "freq" for the oscillator frequency
+#   mode:     "set" (value in range units, Hz for freq), "delta" (normalized
+#             step) or "scale" (frequency factor)
+Intent = namedtuple("Intent", "kind channels param mode value")
+
+STEP = 0.15
+STEP_WORDS = {"bit": 0.05, "little": 0.05, "slightly": 0.05, "lot": 0.3, "much": 0.3, "way": 0.3}
+UP_WORDS = {"more", "increase", "raise", "up", "add", "higher", "longer", "slower"}
+DOWN_WORDS = {"less", "decrease", "lower", "down", "reduce", "shorter", "faster"}
+SET_WORDS = {"set", "to", "at"}
+EXIT_WORDS = {"exit", "quit", "done", "finished", "goodbye", "stop"}
+UNDO_WORDS = {"undo", "back", "previous"}
+SIMILAR_WORDS = {"similar", "another"}
+# nearest presets closer than this are the current sound itself
+SAME_DISTANCE = 1e-3
+# adjectives that name both the parameter and the direction
+ADJECTIVES = {
+    "louder": ("vol", 1), "quieter": ("vol", -1), "softer": ("vol", -1),
+    "brighter": ("H", 1), "darker": ("H", -1), "duller": ("H", -1),
+}
+TIME_PARAMS = {"att", "dec", "rel", "dec2", "del"}
+# how descriptions name parameters whose field name is unclear on its own
+SPOKEN_NAMES = {"L": "bass", "M": "mids", "H": "treble", "dec2": "reverb decay",
+                "del": "reverb delay", "wet": "reverb"}
+SPOKEN_WAVES = {"saw": "saw", "sin": "sine", "sqr": "square"}
+FILLER = {"please", "can", "could", "you", "i", "want", "would", "like", "just", "now", "an",
+          "then", "that", "sound", "slightly", "way", "higher", "hz", "%"}
+KNOWN = set(synth_words()) | FILLER
+
+_UNITS = {w: i for i, w in enumerate(NUMBER_WORDS[:20])}
+_TENS = {w: 10 * (i + 2) for i, w in enumerate(NUMBER_WORDS[20:28])}
+
+def tokenize(text):
+    """Lowercase words and numbers; decimal points and apostrophes are kept."""
+    text = text.lower().replace("%", " percent ")
+    return re.findall(r"\d+(?:\.\d+)?|[a-z']+", text)
+
+def _read_number(tokens, i):
+    """Parse a number starting at tokens[i]; returns (value, next index) or (None, i)."""
+    if i < len(tokens) and re.fullmatch(r"\d+(?:\.\d+)?", tokens[i]):
+        return float(tokens[i]), i + 1
+    if i < len(tokens) and tokens[i] == "half":
+        return 0.5, i + 1
+    total, current, j = 0, None, i
+    while j < len(tokens):
+        w = tokens[j]
+        if w in _UNITS:
+            current = (current or 0) + _UNITS[w]
+        elif w in _TENS:
+            current = (current or 0) + _TENS[w]
+        elif w == "hundred" and current is not None:
+            current *= 100
+        elif w == "thousand" and current is not None:
+            total += current * 1000
+            current = 0
+        elif w == "point" and current is not None and j + 1 < len(tokens) and tokens[j + 1] in _UNITS:
+            # digits after the point, spoken one by one
+            digits, j = "", j + 1
+            while j < len(tokens) and tokens[j] in _UNITS and _UNITS[tokens[j]] < 10:
+                digits += str(_UNITS[tokens[j]])
+                j += 1
+            return total + current + float("0." + digits), j
+        else:
+            break
+        j += 1
+    if current is None:
+        return None, i
+    return total + current, j
+
+def parse(text):
+    """Map a simple spoken edit to an Intent; None if it needs the LLM."""
+    tokens = tokenize(text)
+    if not tokens or any(t not in KNOWN and not t[0].isdigit() for t in tokens):
+        # descriptive or unknown words: leave it to the LLM
+        return None
+
+    words = set(tokens)
+    channels = sorted({WAVE_NAMES.index(WAVE_WORDS[t]) for t in tokens if t in WAVE_WORDS}) or None
+    params = [PARAM_WORDS[t] for t in tokens if t in PARAM_WORDS]
+    if "decay" in words and ("reverb" in words or "tail" in words):
+        params = ["dec2"]
+    elif "reverb" in words and len(set(params)) > 1:
+        # "reverb delay", "reverb wet": the other word names the parameter
+        params = [p for p in params if p != "wet"]
+    if words & {"frequency", "pitch", "hertz", "octave"}:
+        params.append("freq")
+    params = list(dict.fromkeys(params))
+
+    if words & EXIT_WORDS and not params and len(tokens) <= 5:
+        return Intent("exit", None, None, None, None)
+    if not params and channels is None and len(tokens) <= 5 and not words & (UP_WORDS | DOWN_WORDS) - {"back"}:
+        if "redo" in words:
+            return Intent("redo", None, None, None, None)
+        if words & UNDO_WORDS:
+            return Intent("undo", None, None, None, None)
+        if words & SIMILAR_WORDS:
+            return Intent("similar", None, None, None, None)
+    if len(params) > 1:
+        return None
+
+    step = next((STEP_WORDS[t] for t in tokens if t in STEP_WORDS), STEP)
+    adjective = next((ADJECTIVES[t] for t in tokens if t in ADJECTIVES), None)
+    if adjective is not None and not params:
+        key, sign = adjective
+        return Intent("edit", channels, key, "delta", sign * step)
+    if not params:
+        return None
+    key = params[0]
+
+    if key == "freq" and "octave" in words:
+        if words & UP_WORDS:
+            return Intent("edit", channels, "freq", "scale", 2.0)
+        if words & DOWN_WORDS:
+            return Intent("edit", channels, "freq", "scale", 0.5)
+        return None
+
+    # the first number in the sentence, if any
+    value = None
+    for i in range(len(tokens)):
+        value, _ = _read_number(tokens, i)
+        if value is not None:
+            break
+    if value is not None and (words & SET_WORDS or key == "freq"):
+        if key == "freq":
+            return Intent("edit", channels, "freq", "set", value)
+        lo, span = PARAMS[PARAM_INDEX[key]].range
+        # "50 percent" / "50%" (tokenized to "percent") is a fraction of the
+        # range, clamped to it; a plain number is a value in range units, and
+        # one outside the range ("set volume to 50") has units we can't tell,
+        # so it goes to the LLM instead of being clamped to an end
+        if "percent" in words:
+            return Intent("edit", channels, key, "set", min(max(lo + value / 100 * span, lo), lo + span))
+        if not lo <= value <= lo + span:
+            return None
+        return Intent("edit", channels, key, "set", value)
+
+    if key == "freq":
+        # only absolute frequencies and octaves are simple enough
+        return None
+    up, down = words & UP_WORDS, words & DOWN_WORDS
+    if "shorter" in words or "longer" in words:
+        if key not in TIME_PARAMS:
+            return None
+        up, down = words & {"longer"}, words & {"shorter"}
+    if up and not down:
+        return Intent("edit", channels, key, "delta", step)
+    if down and not up:
+        return Intent("edit", channels, key, "delta", -step)
+    if adjective is not None and adjective[0] == key:
+        return Intent("edit", channels, key, "delta", adjective[1] * step)
+    return None
+
+def _describe(intent, chans):
+    names = " and ".join(SPOKEN_WAVES[WAVE_NAMES[c]] for c in chans) if intent.channels else "the sound"
+    if intent.param == "freq":
+        label = "frequency"
+    else:
+        label = SPOKEN_NAMES.get(intent.param, PARAMS[PARAM_INDEX[intent.param]].field.replace("_", " "))
+    if intent.mode == "set":
+        unit = " hertz" if intent.param == "freq" else ""
+        return f"{label.capitalize()} set to {intent.value:g}{unit} on {names}."
+    if intent.mode == "scale":
+        return f"Moved {names} an octave {'up' if intent.value > 1 else 'down'}."
+    if intent.param in TIME_PARAMS:
+        return f"{'Longer' if intent.value > 0 else 'Shorter'} {label} on {names}."
+    return f"{'More' if intent.value > 0 else 'Less'} {label} on {names}."
+
+def apply(intent, sound, history=None, library=None):
+    """
+    Apply an edit Intent through sound.params and return a response in the
+    call_synth_llm() format, so the AI pipeline can treat both paths alike.
+    Undo/redo step through history (a history.PresetHistory); their responses
+    are marked "restored" so they are not recorded again. "similar" loads the
+    closest other preset from library (a presets.PresetLibrary); its response
+    is marked "from_library" so it is not stored there twice.
+    """
+    bank = sound.params
+    if intent.kind == "similar":
+        current = [bank.to_dict(c) for c in range(len(sound.channels))]
+        match = None
+        if library is not None:
+            match = next((library.get(pid) for pid, dist in library.nearest(current)
+                          if dist > SAME_DISTANCE), None)
+        if match is None:
+            return {"exit": 0, "description": "No similar sound stored yet.", "restored": True,
+                    "channels": current}
+        sound.apply_preset({WAVE_NAMES.index(conf["waveform"]["name"]): conf for conf in match["channels"]})
+        return {"exit": 0, "description": f"A similar sound. {match['description']}",
+                "channels": match["channels"], "from_library": True}
+    if intent.kind == "exit":
+        return {"exit": 1, "description": "Okay",
+                "channels": [bank.to_dict(c) for c in range(len(sound.channels))]}
+    if intent.kind in ("undo", "redo"):
+        entry = None
+        if history is not None:
+            entry = history.undo() if intent.kind == "undo" else history.redo()
+        if entry is None:
+            return {"exit": 0, "description": f"Nothing to {intent.kind}.", "restored": True,
+                    "channels": [bank.to_dict(c) for c in range(len(sound.channels))]}
+        sound.apply_preset({WAVE_NAMES.index(conf["waveform"]["name"]): conf for conf in entry["channels"]})
+        return {"exit": 0, "description": f"{intent.kind.capitalize()}. {entry['description']}",
+                "channels": entry["channels"], "restored": True}
+    chans = intent.channels
+    if chans is None:
+        # the audible channels, or all of them if everything is muted
+        chans = [c for c in range(len(sound.channels)) if bank.get(c, PARAM_INDEX["vol"]) > 0] \
+            or list(range(len(sound.channels)))
+    for c in chans:
+        if intent.param == "freq":
+            freq = sound.channels[c].waveform.frequency
+            freq = intent.value if intent.mode == "set" else freq * intent.value
+            bank.apply_dict(c, {"waveform": {"frequency": min(max(freq, 20.0), 8000.0)}})
+            continue
+        i = PARAM_INDEX[intent.param]
+        if intent.mode == "set":
+            bank.set(c, i, intent.value)
+        else:
+            bank.set_normalized(c, i, min(max(bank.normalized(c, i) + intent.value, 0.0), 1.0))
+    return {"exit": 0, "description": _describe(intent, chans),
+            "channels": [bank.to_dict(c) for c in range(len(sound.channels))]}
@@ -1,21 +1,143 @@
-import board
-import busio
+import json
+import queue
+import threading
 import time
-i2c = busio.I2C(board.SCL, board.SDA)
-import adafruit_ads1x15.ads1115 as ADS
-from adafruit_ads1x15.analog_in import AnalogIn
+from collections import deque
 
-channels = [ADS.P0, ADS.P1, ADS.P2, ADS.P3]
+FULL_SCALE = 3.3   # knob supply voltage
+NUM_CHANNELS = 4   # ADS1115 single-ended inputs P0..P3
+
+class ADS1115Backend:
+    """
+    ADS1115 in continuous conversion mode.
+    data_rate: samples per second of the converter (8..860)
+    Switching the input mux restarts conversion on the new pin, so a full
+    scan of n inputs costs about n / data_rate seconds of I2C time.
+    """
+    def __init__(self, data_rate=860, gain=1):
+        # hardware imports are deferred so the mock backend works without I2C
+        import board
+        import busio
+        import adafruit_ads1x15.ads1115 as ADS
+        from adafruit_ads1x15.ads1x15 import Mode
+        from adafruit_ads1x15.analog_in import AnalogIn
+
+        i2c = busio.I2C(board.SCL, board.SDA)
+        self.ads = ADS.ADS1115(i2c, gain=gain, data_rate=data_rate, mode=Mode.CONTINUOUS)
+        self.inputs = [AnalogIn(self.ads, pin) for pin in (ADS.P0, ADS.P1, ADS.P2, ADS.P3)]
+
+    def read(self, cid):
+        return self.inputs[cid].voltage
+
+class MockBackend:
+    """
+    Replays recorded voltage traces instead of talking to the ADC.
+    traces: {cid: [v0, v1, ...]}; each read() returns the next sample of that
+    channel, then holds the last value (or wraps around when loop=True).
+    """
+    def __init__(self, traces, loop=False):
+        self.traces = {int(cid): list(vals) for cid, vals in traces.items()}
+        self.loop = loop
+        self.pos = {cid: 0 for cid in self.traces}
+
+    @classmethod
+    def from_file(cls, path, loop=False):
+        """Load traces saved as JSON: {"0": [...], "1": [...]}."""
+        with open(path) as f:
+            return cls(json.load(f), loop=loop)
+
+    def read(self, cid):
+        trace = self.traces.get(cid)
+        if not trace:
+            return 0.0
+        i = self.pos[cid]
+        if i >= len(trace):
+            i = 0 if self.loop else len(trace) - 1
+        self.pos[cid] = i + 1
+        return trace[i]
+
+    def finished(self):
+        return not self.loop and all(self.pos[c] >= len(t) for c, t in self.traces.items())
+
+class KnobSampler(threading.Thread):
+    """
+    Background scanner for the knob inputs.
+    Each scan reads every channel, runs a median filter followed by an EMA,
+    and emits (cid, voltage, timestamp) on `events` once the filtered value
+    moves more than `hysteresis` volts from the last reported one.
+    """
+    def __init__(self, backend, channels=(0, 1, 2, 3), scan_rate=50.0,
+                 median=5, alpha=0.35, hysteresis=FULL_SCALE * 0.01, on_event=None):
+        super().__init__(daemon=True)
+        self.backend = backend
+        self.channels = tuple(channels)
+        self.scan_rate = scan_rate
+        self.alpha = alpha
+        self.hysteresis = hysteresis
+        # optional callable, invoked from the sampler thread after each queued event
+        self.on_event = on_event
+        self.events = queue.Queue()
+        self.shutdown = threading.Event()
+
+        self._window = {cid: deque(maxlen=median) for cid in self.channels}
+        self._ema = {cid: None for cid in self.channels}
+        self.last_voltage = {cid: None for cid in self.channels}
+
+    def _filter(self, cid, v):
+        window = self._window[cid]
+        window.append(v)
+        med = sorted(window)[len(window) // 2]
+        ema = self._ema[cid]
+        ema = med if ema is None else ema + self.alpha * (med - ema)
+        self._ema[cid] = ema
+
+        last = self.last_voltage[cid]
+        if last is None:
+            # first reading only primes the filter
+            self.last_voltage[cid] = ema
+            return None
+        if abs(ema - last) > self.hysteresis:
+            self.last_voltage[cid] = ema
+            return ema
+        return None
+
+    def step(self):
+        """Scan all channels once; returns the number of events emitted."""
+        emitted = 0
+        for cid in self.channels:
+            value = self._filter(cid, self.backend.read(cid))
+            if value is not None:
+                self.events.put((cid, value, time.monotonic()))
+                emitted += 1
+        if emitted and self.on_event is not None:
+            self.on_event()
+        return emitted
+
+    def run(self):
+        period = 1.0 / self.scan_rate
+        next_t = time.monotonic()
+        while not self.shutdown.is_set():
+            try:
+                self.step()
+            except OSError as e:
+                # transient I2C errors should not kill the sampler
+                print("Knob read failed:", e)
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                self.shutdown.wait(delay)
+            else:
+                next_t = time.monotonic()
+
+    def stop(self):
+        self.shutdown.set()
 
 class KnobInput:
-    def __init__(self, cid=0):
-        self.ads = ADS.ADS1115(i2c)
-        self.channel = AnalogIn(self.ads, channels[cid])
-        
-        self.last_voltage = 0
-        self.threshold = 3.3 * 0.01
-        self.poll_interval = 0.1  # seconds
-        self.last_time = None
-
-    def read_knob(self, i_channel):
-        return channel.value, channel.voltage
\ No newline at end of file
+    """Single-shot reader for one input, kept for quick hardware checks."""
+    def __init__(self, cid=0, backend=None):
+        self.backend = backend or ADS1115Backend()
+        self.cid = cid
+        self.threshold = FULL_SCALE * 0.01
+
+    def read_knob(self):
+        return self.backend.read(self.cid)
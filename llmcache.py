@@ -0,0 +1,121 @@
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+
+from params import PARAMS
+
+def normalize_transcript(text):
+    """Lowercase, drop punctuation (keeping decimal points) and collapse whitespace."""
+    text = text.lower()
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)|[^\w\s.]", " ", text)
+    return " ".join(text.split())
+
+def quantize_params(params, step=0.05):
+    """
+    Snap a get_current_params() list onto a coarse grid so nearby states share a key:
+    each registered parameter to `step` of its range, frequency to the nearest semitone.
+    """
+    grid = []
+    for conf in params:
+        row = [conf["waveform"]["name"],
+               round(12 * math.log2(max(float(conf["waveform"]["frequency"]), 1.0) / 440.0))]
+        for spec in PARAMS:
+            section = conf if spec.section is None else conf[spec.section]
+            lo, span = spec.range
+            row.append(round((float(section[spec.field]) - lo) / span / step))
+        grid.append(row)
+    return grid
+
+class ResponseCache:
+    """
+    On-disk cache of LLM responses keyed by (normalized transcript, quantized params).
+    One JSON file per entry; the file mtime doubles as the LRU access time.
+    Entries older than max_age are dropped, then the least recently used ones
+    until the cache fits in max_entries and max_bytes.
+    """
+    def __init__(self, path=".llm_cache", max_entries=500, max_bytes=2_000_000,
+                 max_age=7 * 24 * 3600, step=0.05):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.step = step
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        # key -> [access time, size]
+        self.index = {}
+        for name in os.listdir(path):
+            if name.endswith(".json"):
+                st = os.stat(os.path.join(path, name))
+                self.index[name[:-5]] = [st.st_mtime, st.st_size]
+        self._evict()
+
+    def key(self, user_text, params):
+        raw = json.dumps([normalize_transcript(user_text), quantize_params(params, self.step)])
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, key + ".json")
+
+    def get(self, user_text, params):
+        key = self.key(user_text, params)
+        now = time.time()
+        with self._lock:
+            entry = self.index.get(key)
+            if entry is None or now - entry[0] > self.max_age:
+                self.misses += 1
+                return None
+            try:
+                with open(self._file(key)) as f:
+                    resp = json.load(f)
+            except (OSError, ValueError):
+                self.index.pop(key, None)
+                self.misses += 1
+                return None
+            os.utime(self._file(key), (now, now))
+            entry[0] = now
+            self.hits += 1
+            return resp
+
+    def put(self, user_text, params, resp):
+        key = self.key(user_text, params)
+        data = json.dumps(resp)
+        tmp = self._file(key) + ".tmp"
+        with self._lock:
+            with open(tmp, "w") as f:
+                f.write(data)
+            os.replace(tmp, self._file(key))
+            self.index[key] = [time.time(), len(data)]
+            self._evict()
+
+    def _evict(self):
+        now = time.time()
+        stale = [k for k, (t, _) in self.index.items() if now - t > self.max_age]
+        by_age = sorted((k for k in self.index if k not in stale), key=lambda k: self.index[k][0])
+        total = sum(self.index[k][1] for k in by_age)
+        while by_age and (len(by_age) > self.max_entries or total > self.max_bytes):
+            k = by_age.pop(0)
+            total -= self.index[k][1]
+            stale.append(k)
+        for k in stale:
+            self.index.pop(k, None)
+            try:
+                os.remove(self._file(k))
+            except OSError:
+                pass
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.index),
+            "bytes": sum(size for _, size in self.index.values()),
+        }
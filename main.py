@@ -1,21 +1,43 @@
 import os
 import sys
 import time
+STARTUP_T0 = time.perf_counter()
 import pygame, pigame
 import RPi.GPIO as GPIO
 from pygame.locals import *
 import threading
-import json
 
 import numpy as np
 import sounddevice as sd
 
 from channel import *
 from sound import *
+from params import WAVE_NAMES, PARAM_KEYS
 import view
 import knob
-import reaction
-from reaction import call_synth_llm
+import inputbus
+import speech
+import history
+import automation
+import modulation
+# reaction, llmcache and ai_pipeline (and through them openai/vosk) are
+# imported by init_ai() on demand, so the synth starts without them
+
+# Startup report: seconds spent per phase, printed once the synth is playable
+startup_phases = []
+_phase_start = STARTUP_T0
+
+def startup_phase(name):
+    global _phase_start
+    now = time.perf_counter()
+    startup_phases.append((name, now - _phase_start))
+    _phase_start = now
+
+def print_startup_report():
+    total = sum(t for _, t in startup_phases)
+    print("Startup (s): " + ", ".join(f"{name} {t:.2f}" for name, t in startup_phases) + f", total {total:.2f}")
+
+startup_phase("imports")
 
 # Set up the piTFT display
 os.putenv('SDL_VIDEODRIVER', 'fbcon')
@@ -26,22 +48,51 @@ os.putenv('DISPLAY','')
 
 # constants
 SAMPLE_RATE = 44100
+AI_FRAME_INTERVAL = 1 / 30   # frame interval while the AI interface animates
+IDLE_WAKE_INTERVAL = 1.0     # safety net wake-up when nothing signals the loop
+
+# Main loop wake-up: every producer (GPIO, knob, AI thread, touchscreen) sets it
+wake = threading.Event()
+dirty = False
+
+def request_redraw():
+    """Mark the screen dirty and wake the main loop."""
+    global dirty
+    dirty = True
+    wake.set()
 
 # pygame initialize
 pygame.init()
-pitft = pigame.PiTft()
+pitft = pigame.PiTft(on_event=wake.set)
 screen = pygame.display.set_mode(view.size)
 pygame.display.update()
 pygame.mouse.set_visible(False)
+startup_phase("display")
 
 # GPIO initialize
 button_pins = {17: "play", 22: "wave_sel", 23: "param_sel_up", 27: "param_sel_down", 19: "record_playback", 26: "AI"}
 GPIO.setmode(GPIO.BCM)
 for pin, cmd in button_pins.items():
     GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+startup_phase("GPIO")
+
+# Input bus: producers only timestamp and queue, one dispatcher thread debounces and applies
+bus = inputbus.InputBus()
+BUTTON_DEBOUNCE = 0.2   # seconds, replaces the RPi.GPIO bouncetime + sleep
+NOTE_DEBOUNCE = 0.01
+
+def gpio_edge(pin):
+    # runs in the RPi.GPIO thread: read the level and get out
+    bus.post(button_pins[pin], GPIO.input(pin))
+
+def forward_knob_events():
+    # runs in the sampler thread, keeps the sampler's own timestamps
+    while not knob_sampler.events.empty():
+        cid, voltage, t = knob_sampler.events.get_nowait()
+        bus.post(f"knob{cid}", voltage, t)
 
-# Knob initialize
-knob_in0 = knob.KnobInput(cid=0)
+# Knob initialize: background sampler scanning P0..P3, only P0 is wired to a knob
+knob_sampler = knob.KnobSampler(knob.ADS1115Backend(data_rate=860), scan_rate=50.0, on_event=forward_knob_events)
 
 # Sound setup
 sound = Sound(sr=SAMPLE_RATE)
@@ -69,17 +120,30 @@ channel3 = Channel(square_wave, env3, filter3, rvb3, sr=SAMPLE_RATE, volume=0.0)
 sound.add_channel(channel1)
 sound.add_channel(channel2)
 sound.add_channel(channel3)
+# knob/touch moves recorded with each take, played back on the synth afterwards
+sound.automation = automation.Automation(on_change=wake.set)
+# LFO routings (none by default): sound.modulation.route(sound.modulation.add_lfo(5.0), 0, 'pitch', 0.3)
+sound.modulation = modulation.ModMatrix(sound)
+
+# Restore the last preset from the history (seeded from last_preset.json on first run)
+preset_history = history.PresetHistory("history.jsonl", seed="last_preset.json")
+last_entry = preset_history.current()
+if last_entry is not None:
+    for ch_conf in last_entry["channels"]:
+        sound.params.apply_dict(WAVE_NAMES.index(ch_conf["waveform"]["name"]), ch_conf)
+    print(f"Restored preset {len(preset_history)}: {last_entry['description']}")
+startup_phase("history")
 
 # View setup
 font = pygame.font.Font(None, 23)
 box_sel_idx = [0, 0]
-wave_names = ["saw", "sin", "sqr"]
-param_names = ["vol", "att", "dec", "sus", "rel", "L", "M", "H", "dec2", "del", "wet"]
+wave_names = list(WAVE_NAMES)
+param_names = list(PARAM_KEYS)
 
 view.draw_screen(screen, font, sound, "saw", "vol")
+startup_phase("sound+view")
 
 # Recording/playback state
-dirty = False
 record_state = 0       # 0=idle, 1=recording, 3=playback
 record_frames = []     # list of numpy arrays
 playback_buffer = None
@@ -88,123 +152,127 @@ playback_pos = 0
 # AI setup
 AI_state = "idle"
 ai_abort = threading.Event()
-api_key_path = ".openai_api_key"
-llm = reaction.LLMClient(api_key_path=api_key_path)
-with open(api_key_path) as f:
-    api_key = f.read().strip()
-stt = reaction.SpeechToTextLocal(
-    model_path="/home/pi/vosk_models/vosk-model-en-us-0.22-lgraph",
-    samplerate=44100,
-    threshold=0.02,
-    silence_duration=1.0,
-    max_record_time=30.0
-)
-# stt = reaction.SpeechToTextWhisper(
-#     api_key_path=".openai_api_key",
-#     model="whisper-1",
-#     samplerate=44100,
-#     threshold=0.02,
-#     silence_duration=1.0,
-#     max_record_time=None   # or e.g. 30 to cap recording at 30 s
-# )
-tts = reaction.TextToSpeech()
+ai_session = 0   # bumped on every AI-mode entry so a stale worker does not clean up a newer one
+# speech is rendered once per phrase and mixed into the synth output stream
+speech_mixer = speech.SpeechMixer(SAMPLE_RATE)
+# AI components, built by init_ai()
+llm = llm_cache = stt = tts = preset_library = None
+ai_init_lock = threading.Lock()
+# build them in the background once the stream is up (see below), so the first
+# AI press does not wait; otherwise the first AI press builds them
+PRELOAD_AI = True
+
+def init_ai():
+    """Import and build the AI-mode components once; safe to call from any thread."""
+    global reaction, ai_pipeline, llm, llm_cache, stt, tts, preset_library
+    with ai_init_lock:
+        if tts is not None:
+            return
+        t0 = time.perf_counter()
+        import reaction
+        import llmcache
+        import ai_pipeline
+        import vocab
+        import presets
+        llm = reaction.LLMClient(api_key_path=".openai_api_key")
+        llm_cache = llmcache.ResponseCache(".llm_cache")
+        preset_library = presets.PresetLibrary("presets.db")
+        stt = reaction.SpeechToTextLocal(
+            model_path="/home/pi/vosk_models/vosk-model-en-us-0.22-lgraph",
+            samplerate=44100,
+            threshold=0.02,
+            silence_duration=1.0,
+            max_record_time=30.0,
+            # decode against the synth vocabulary first, open vocabulary as fallback
+            grammar=vocab.recognizer_grammar()
+        )
+        # stt = reaction.SpeechToTextWhisper(
+        #     api_key_path=".openai_api_key",
+        #     model="whisper-1",
+        #     samplerate=44100,
+        #     threshold=0.02,
+        #     silence_duration=1.0,
+        #     max_record_time=None   # or e.g. 30 to cap recording at 30 s
+        # )
+        phrase_bank = speech.PhraseBank(SAMPLE_RATE, cache_dir=".tts_cache")
+        phrase_bank.warm([ai_pipeline.GREETING, ai_pipeline.THINKING, ai_pipeline.PREVIEW])
+        tts = reaction.TextToSpeech(mixer=speech_mixer, bank=phrase_bank)
+        print(f"AI components ready after {time.perf_counter() - t0:.2f} s")
+
+def preload_ai():
+    try:
+        init_ai()
+        if hasattr(stt, "load"):
+            stt.load()   # the Vosk model, prints its own load time
+    except Exception as e:
+        print("AI preload failed, AI mode will retry on first use:", e)
+
+def apply_channel_conf(ch_conf):
+    idx = wave_names.index(ch_conf["waveform"]["name"])
+    # set parameters from the LLM response
+    print(f"Channel {idx} config: {ch_conf}")
+    # built here, swapped in by the audio callback with a short crossfade
+    sound.apply_preset({idx: ch_conf})
+
+def record_preset(resp):
+    # undo/redo and exit responses change nothing new
+    if resp.get("restored") or resp.get("exit") or not resp.get("channels"):
+        return
+    # queued for the history's writer thread
+    preset_history.append(resp["channels"], resp.get("description", ""))
+    # and kept in the searchable library (rendered in the background)
+    if preset_library is not None and not resp.get("from_library"):
+        preset_library.add_async(resp["channels"], resp.get("description", ""))
+
+def set_ai_state(state):
+    """Stage callback from the AI pipeline."""
+    global AI_state, dirty
+    if ai_abort.is_set():
+        return
+    if state == "preview":
+        # suspend the AI-sphere animation while the preview note plays
+        dirty = False
+        return
+    AI_state = state
+    request_redraw()
 
 def ai_conversation_loop():
     """
-    silence → listen → reasoning → speak → silence
+    listen → reasoning → speak → preview → listen, as an asyncio stage graph
     """
-    global AI_state, dirty, sound, wave_names
-
-    user_text = ""
-    llm_response = {}
-
-    tts.speak("Entering AI mode. Please describe the sound you want to create.")
-    while not ai_abort.is_set():
-        if AI_state == "silence":
-            dirty = True
-            AI_state = "listen"
-            continue
-
-        if AI_state == "listen":
-            dirty = True
-            user_text = stt.record_and_transcribe()
-            print(f"📝 Transcription result: '{user_text}'")
-            AI_state = "reasoning"
-            continue
-
-        if AI_state == "reasoning":
-            dirty = True
-            # call into your helper in reaction.py
-            tts.speak("AI starts thinking.")
-            llm_response = call_synth_llm(
-                llm,
-                f"Current parameters are:\n{str(sound.get_current_params())}\nUser request is: {user_text}"
-                )
-            tts.speak("AI thinking finished.")
-            # persist channels locally
-            with open("last_preset.json", "w") as f:
-                json.dump(llm_response, f, indent=2)
-            if llm_response.get("exit", 1) == 1:
-                # user wants to quit AI mode immediately
-                tts.speak(f'''{llm_response.get("description", "")}. Exiting AI mode''')
-                ai_abort.set()
-                print("LLM returned exit=1, quitting AI mode")
-                break
-            AI_state = "speak"
-            continue
-
-        if AI_state == "speak":
-            dirty = True
-            # speak the description
-            desc = llm_response.get("description", "")
-            print(f"LLM response description: {desc}")
-            tts.speak(desc)
-            # you could also immediately apply the channel settings:
-            for ch_conf in llm_response.get("channels", []):
-                idx = wave_names.index(ch_conf["waveform"]["name"])
-                chan = sound.channels[idx]
-                # set parameters from the LLM response
-                print(f"Channel {idx} config: {ch_conf}")
-                chan.waveform = Waveform(wave_names[idx], frequency=float(ch_conf["waveform"]["frequency"]))
-                chan.volume = float(ch_conf["volume"])
-                chan.envelopes[0].attack_time = float(ch_conf["envelope"]["attack_time"])
-                chan.envelopes[0].decay_time = float(ch_conf["envelope"]["decay_time"])
-                chan.envelopes[0].sustain_level = float(ch_conf["envelope"]["sustain_level"])
-                chan.envelopes[0].release_time = float(ch_conf["envelope"]["release_time"])
-                chan.filters[0].low = float(ch_conf["filter"]["low"])
-                chan.filters[0].mid = float(ch_conf["filter"]["mid"])
-                chan.filters[0].high = float(ch_conf["filter"]["high"])
-                chan.reverbs[0].decay = float(ch_conf["reverb"]["decay"])
-                chan.reverbs[0].delay = float(ch_conf["reverb"]["delay"])
-                chan.reverbs[0].wet = float(ch_conf["reverb"]["wet"])
-                # ...and so on for envelope, filter, reverb
-            # Play the sound
-            tts.speak("Here is the sound:")
-            time.sleep(0.5)
-            dirty = False
-            sound.note_on() # trigger note on
-            time.sleep(2)
-            sound.note_off()  # trigger note off
-            time.sleep(3)
-            dirty = True
-            AI_state = "silence"
-            continue
-
-        time.sleep(0.05)
+    global AI_state
+    session = ai_session
+    if tts is None:
+        set_ai_state("loading")
+    try:
+        init_ai()
+        available = True
+    except Exception as e:
+        print("AI mode unavailable:", e)
+        available = False
+    if available and not ai_abort.is_set():
+        pipeline = ai_pipeline.AIPipeline(
+            sound, llm, stt, tts, ai_abort, cache=llm_cache,
+            on_state=set_ai_state, apply_channel=apply_channel_conf, on_response=record_preset,
+            history=preset_history, library=preset_library)
+        pipeline.run()
 
     # cleanup
-    AI_state = "idle"
-    dirty = True
+    if session == ai_session:
+        ai_abort.set()
+        speech_mixer.stop()
+        AI_state = "idle"
+        request_redraw()
 
-# GPIO callbacks
-def GPIO19_callback(channel):
-    # Record/Playback button callback
+# GPIO handlers, run on the input bus dispatcher thread
+def GPIO19_callback(ev):
+    # Record/Playback button
     global record_state, record_frames, playback_buffer, playback_pos
-    time.sleep(0.05)
     if record_state == 0:
         # start recording
         record_frames = []
         record_state = 1
+        sound.automation.start_recording(sound)
         print("\nRecording started")
     elif record_state == 1:
         # stop recording
@@ -214,26 +282,26 @@ def GPIO19_callback(channel):
             playback_buffer = np.array([], dtype='float32')
         playback_pos = 0
         record_state = 2
-        print("\nRecording stopped")
+        sound.automation.stop_recording(sound)
+        print(f"\nRecording stopped, {len(sound.automation.lanes)} automation lanes")
     elif record_state == 2:
-        # start playback
+        # start playback; the take's knob moves replay with the recorded audio
+        sound.automation.play(loop=False)
         record_state = 3
         print("\nStart playback")
-GPIO.add_event_detect(19, GPIO.FALLING, callback=GPIO19_callback, bouncetime=300)
 
-def GPIO26_callback(channel):
+def GPIO26_callback(ev):
     """
     Light callback: toggle AI mode on/off, signal the worker thread.
     """
-    global AI_state, dirty
-
-    time.sleep(0.05)
+    global AI_state, ai_session
 
     # entering AI mode?
     if AI_state == "idle":
+        ai_session += 1
         ai_abort.clear()           # ensure the flag is off
         AI_state = "silence"
-        dirty = True
+        request_redraw()
         # start the daemon thread
         t = threading.Thread(target=ai_conversation_loop, daemon=True)
         t.start()
@@ -241,84 +309,86 @@ def GPIO26_callback(channel):
     # exiting AI mode?
     else:
         ai_abort.set()             # tell the thread to stop ASAP
+        speech_mixer.stop()        # and cut any speech mid-word
         print("Exiting AI mode")
         # thread will reset AI_state to 'idle' on its own
         # but we can force it right away
         AI_state = "idle"
-        dirty = True
-GPIO.add_event_detect(26, GPIO.FALLING, callback=GPIO26_callback, bouncetime=300)
+        request_redraw()
 
-def GPIO17_callback(channel):
-    # Play/Stop button callback
-    if GPIO.input(17) == GPIO.LOW:
+def GPIO17_callback(ev):
+    # Play/Stop button, ev.value is the debounced pin level
+    if ev.value == GPIO.LOW:
         sound.note_on()
-        print("\nNote key pressed")
     else:
         sound.note_off()
-        print("\nNote key released")
-GPIO.add_event_detect(17, GPIO.BOTH, callback=GPIO17_callback, bouncetime=10)
 
-def GPIO22_callback(channel):
-    # Waveform selection button callback
-    global box_sel_idx, dirty
+def GPIO22_callback(ev):
+    # Waveform selection button
     box_sel_idx[0] = (box_sel_idx[0] + 1) % len(wave_names)
-    dirty = True
-    print(f"Waveform selection changed to {wave_names[box_sel_idx[0]]}")
-GPIO.add_event_detect(22, GPIO.FALLING, callback=GPIO22_callback, bouncetime=300)
+    request_redraw()
 
-def GPIO23_callback(channel):
-    # Parameter selection up button callback
-    global box_sel_idx, dirty
+def GPIO23_callback(ev):
+    # Parameter selection up button
     box_sel_idx[1] = (box_sel_idx[1] - 1) % len(param_names)
-    dirty = True
-    print(f"Parameter selection changed to {param_names[box_sel_idx[1]]}")
-GPIO.add_event_detect(23, GPIO.FALLING, callback=GPIO23_callback, bouncetime=300)
+    request_redraw()
 
-def GPIO27_callback(channel):
-    # Parameter selection down button callback
-    global box_sel_idx, dirty
+def GPIO27_callback(ev):
+    # Parameter selection down button
     box_sel_idx[1] = (box_sel_idx[1] + 1) % len(param_names)
-    dirty = True
-    print(f"Parameter selection changed to {param_names[box_sel_idx[1]]}")
-GPIO.add_event_detect(27, GPIO.FALLING, callback=GPIO27_callback, bouncetime=300)
+    request_redraw()
 
-# Knob voltage change callback (unchanged)
-QUANT_STEPS = {'vol':100,'att':100,'dec':100,'sus':100,'rel':100,'L':100,'M':100,'H':100,'dec2':50,'del':50,'wet':50}
+def edit_param(ch, i, v, t):
+    """Hand edit from the knob or touch at time t: apply it and record it for automation."""
+    previous = sound.params.get(ch, i)
+    if sound.params.set_normalized(ch, i, v):
+        sound.automation.record(sound, ch, i, sound.params.get(ch, i), t, previous)
+        wake.set()
 
-def set_quantized(obj, attr, range_list, v, steps):
-    min_r, span = range_list
-    vq = round(v * steps) / steps
-    setattr(obj, attr, min_r + vq * span)
-
-def on_knob_in0_voltage_change(voltage):
+# Knob voltage change callback
+def on_knob_in0_voltage_change(ev):
     # Set the voltage to a value between 0.0 and 3.3
-    # and map it to the parameter range
-    global dirty, box_sel_idx
-    v = 1 - min(max(voltage, 0.0), 3.3) / 3.3
-    cha   = sound.channels[box_sel_idx[0]]
-    key   = param_names[box_sel_idx[1]]
-    steps = QUANT_STEPS.get(key, 100)
-    PARAM_MAP = {
-        'vol':  (cha,                'volume',        cha.vol_range),
-        'att':  (cha.envelopes[0],   'attack_time',   cha.env_att_range),
-        'dec':  (cha.envelopes[0],   'decay_time',    cha.env_dec_range),
-        'sus':  (cha.envelopes[0],   'sustain_level', cha.env_sus_range),
-        'rel':  (cha.envelopes[0],   'release_time',  cha.env_rel_range),
-        'L':    (cha.filters[0],     'low',           cha.filter_l_range),
-        'M':    (cha.filters[0],     'mid',           cha.filter_m_range),
-        'H':    (cha.filters[0],     'high',          cha.filter_h_range),
-        'dec2': (cha.reverbs[0],     'decay',         cha.rev_dec_range),
-        'del':  (cha.reverbs[0],     'delay',         cha.rev_del_range),
-        'wet':  (cha.reverbs[0],     'wet',           cha.rev_wet_range),
-    }
-    if key not in PARAM_MAP:
-        raise ValueError(f"Unknown index: {key}")
-    target, attr, range_list = PARAM_MAP[key]
-    set_quantized(target, attr, range_list, v, steps)
-    dirty = True
+    # and map it to the selected parameter's range via the registry
+    v = 1 - min(max(ev.value, 0.0), 3.3) / 3.3
+    edit_param(box_sel_idx[0], box_sel_idx[1], v, ev.t)
+
+# Touch drag: vertical drags edit the selected parameter, DRAG_PIXELS spans its full range
+DRAG_PIXELS = 150
+drag_start = None
+
+def on_touch_drag(ev):
+    """Touch counterpart of the knob: same edit path, so a changed value wakes the loop to redraw."""
+    global drag_start
+    event = ev.value
+    ch, i = box_sel_idx
+    if event.type == MOUSEBUTTONDOWN:
+        drag_start = (event.pos[1], sound.params.normalized(ch, i))
+        return
+    if drag_start is None or not event.buttons[0]:
+        return
+    y0, v0 = drag_start
+    v = min(max(v0 + (y0 - event.pos[1]) / DRAG_PIXELS, 0.0), 1.0)
+    edit_param(ch, i, v, ev.t)
+
+bus.register("play", GPIO17_callback, NOTE_DEBOUNCE, level=True)
+bus.register("wave_sel", GPIO22_callback, BUTTON_DEBOUNCE)
+bus.register("param_sel_up", GPIO23_callback, BUTTON_DEBOUNCE)
+bus.register("param_sel_down", GPIO27_callback, BUTTON_DEBOUNCE)
+bus.register("record_playback", GPIO19_callback, BUTTON_DEBOUNCE)
+bus.register("AI", GPIO26_callback, BUTTON_DEBOUNCE)
+bus.register("knob0", on_knob_in0_voltage_change)
+bus.register("touch", on_touch_drag)
+bus.start()
+for pin, cmd in button_pins.items():
+    GPIO.add_event_detect(pin, GPIO.BOTH if cmd == "play" else GPIO.FALLING, callback=gpio_edge)
 
 # Audio callback with integrated recording & playback
 def audio_callback(outdata, frames, time_info, status):
+    fill_output(outdata, frames)
+    # AI speech on top, with the synth ducked under it
+    speech_mixer.mix(outdata[:,0])
+
+def fill_output(outdata, frames):
     global record_state, record_frames, playback_buffer, playback_pos
     # recording phase: capture synth output
     if record_state == 1:
@@ -331,11 +401,16 @@ def audio_callback(outdata, frames, time_info, status):
         start = playback_pos
         end   = start + frames
         chunk = playback_buffer[start:end]
+        if sound.automation.playing:
+            # advanced in step with the buffer, so the cells follow the audio
+            sound.automation.render(sound, frames)
         if len(chunk) < frames:
             outdata[:len(chunk),0] = chunk
             outdata[len(chunk):,0] = 0
             record_state = 0
             playback_buffer = None
+            sound.automation.stop()
+            wake.set()
             print("Playback finished")
         else:
             outdata[:,0] = chunk
@@ -349,32 +424,53 @@ def audio_callback(outdata, frames, time_info, status):
 running = True
 dirty = True
 clock = pygame.time.Clock()
-knob_in0.last_time = time.time()
-knob_in0.last_voltage = knob_in0.channel.voltage
+knob_sampler.start()
 
 with sd.OutputStream(samplerate=SAMPLE_RATE, channels=1, dtype='float32', callback=audio_callback):
+    startup_phase("stream")
+    print_startup_report()
+    if PRELOAD_AI:
+        threading.Thread(target=preload_ai, daemon=True).start()
     try:
         while running:
+            # sleep until a producer signals us; only the AI animation needs a frame clock
+            animating = AI_state != "idle" and dirty
+            wake.wait(AI_FRAME_INTERVAL if animating else IDLE_WAKE_INTERVAL)
+            wake.clear()
+            pitft.update()
             for event in pygame.event.get():
                 if event.type == QUIT:
                     running = False
-            # knob polling
-            now = time.time()
-            if now - knob_in0.last_time > knob_in0.poll_interval:
-                knob_in0.last_time = now
-                new_voltage = knob_in0.channel.voltage
-                if abs(new_voltage - knob_in0.last_voltage) > knob_in0.threshold:
-                    knob_in0.last_voltage = new_voltage
-                    on_knob_in0_voltage_change(new_voltage)
-            # redraw if needed
-            if dirty:
-                if AI_state == "idle":
-                    view.draw_screen(screen, font, sound, wave_names[box_sel_idx[0]], param_names[box_sel_idx[1]])
+                elif AI_state == "idle" and event.type in (MOUSEBUTTONDOWN, MOUSEMOTION) \
+                        and hasattr(event, "time"):
+                    # event.time is the evdev (wall clock) arrival time; events
+                    # without it are SDL's own, e.g. the motion from pigame's
+                    # mouse.set_pos() warp, and are not touches
+                    bus.post("touch", event, time.monotonic() - (time.time() - event.time))
+            # redraw if needed: full screen on layout/mode changes, changed cells otherwise
+            changes = sound.params.pop_changes()
+            if AI_state == "idle":
+                wave_name, param_name = wave_names[box_sel_idx[0]], param_names[box_sel_idx[1]]
+                if dirty:
                     dirty = False
-                else:
-                    view.draw_AI_interface(screen, font, AI_state)
-            clock.tick(30)
+                    view.draw_screen(screen, font, sound, wave_name, param_name)
+                elif changes:
+                    view.draw_changes(screen, font, sound, changes, wave_name, param_name)
+            elif dirty:
+                view.draw_AI_interface(screen, font, AI_state)
+                clock.tick(30)
     except KeyboardInterrupt:
         pass
     finally:
+        knob_sampler.stop()
+        bus.stop()
+        print("Input latency (ms):", bus.latency_stats())
+        if getattr(stt, "load_time", None) is not None:
+            print(f"Speech model load: {stt.load_time:.2f} s (background)")
+            print("Speech decodes:", stt.decodes)
+        preset_history.flush()
+        if preset_library is not None:
+            preset_library.flush()
+        if llm is not None and llm.stats["calls"]:
+            print("LLM calls:", llm.stats)
         del pitft
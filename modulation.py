@@ -0,0 +1,113 @@
+import numpy as np
+
+from params import PARAMS, PARAM_INDEX
+
+# LFO waveforms, all in [-1, 1] over a phase in [0, 1)
+SHAPES = ("sine", "triangle", "saw", "square")
+
+# modulation targets: registry keys plus the oscillator pitch (in semitones)
+TARGETS = ("vol", "L", "M", "H", "dec2", "del", "wet", "pitch")
+# interpolated to audio rate; the others take one value per block
+SMOOTH = {"vol", "wet", "pitch"}
+
+def lfo_values(shapes, phases):
+    """Evaluate LFO shape codes (n,) at phases (n, k) in one vectorized pass."""
+    p = phases % 1.0
+    return np.choose(shapes[:, None], (
+        np.sin(2 * np.pi * p),
+        1 - 4 * np.abs((p + 0.25) % 1.0 - 0.5),
+        2 * p - 1,
+        np.where(p < 0.5, 1.0, -1.0),
+    ))
+
+class ModMatrix:
+    """
+    LFOs and a modulation matrix for a Sound, evaluated at `control_rate`.
+
+    Per block, every LFO is evaluated at the control points that fall in it
+    as one (lfos x points) array, and all routings are summed into a
+    (channels x targets x points) offset grid with one np.add.at, so the cost
+    grows with the number of control points, not with per-sample Python.
+    Only SMOOTH targets are interpolated to audio rate; filter bands and
+    reverb decay/delay use the block's first control value. Offsets add to
+    the stored (or automated) value without changing it and are handed to
+    Channel.process() like automation curves.
+
+    depth is a fraction of the parameter range (0.2 = +-20%), or semitones
+    for "pitch".
+    """
+    def __init__(self, sound, control_rate=200.0):
+        self.sound = sound
+        self.control_rate = control_rate
+        # LFOs (rate, shape, start phase) and routings (lfo, channel, target,
+        # depth) as parallel arrays, each set replaced whole with one
+        # assignment so the audio thread always sees a consistent one
+        self.lfos = (np.empty(0), np.empty(0, dtype=int), np.empty(0))
+        self.routes = (np.empty(0, dtype=int),) * 3 + (np.empty(0),)
+        self._phases = np.empty(0)   # running LFO phases, written by render() only
+
+    @property
+    def active(self):
+        return len(self.routes[0]) > 0
+
+    def add_lfo(self, rate, shape="sine", phase=0.0):
+        """Add an LFO (rate in Hz); returns its index."""
+        if shape not in SHAPES:
+            raise ValueError(f"Unknown LFO shape '{shape}'")
+        rates, shapes, phases = self.lfos
+        self.lfos = (np.append(rates, float(rate)), np.append(shapes, SHAPES.index(shape)),
+                     np.append(phases, float(phase)))
+        return len(rates)
+
+    def route(self, lfo, ch, target, depth):
+        """Route LFO `lfo` to `target` (a TARGETS key) of channel ch; returns the routing index."""
+        if target not in TARGETS:
+            raise ValueError(f"Cannot modulate '{target}', targets are {', '.join(TARGETS)}")
+        if not 0 <= lfo < len(self.lfos[0]):
+            raise ValueError(f"No LFO {lfo}")
+        if not 0 <= ch < len(self.sound.channels):
+            raise ValueError(f"No channel {ch}")
+        src, chans, tgts, depths = self.routes
+        self.routes = (np.append(src, lfo), np.append(chans, ch),
+                       np.append(tgts, TARGETS.index(target)), np.append(depths, float(depth)))
+        return len(src)
+
+    def clear(self):
+        self.routes = (np.empty(0, dtype=int),) * 3 + (np.empty(0),)
+
+    def render(self, sound, frames, curves):
+        """
+        Advance the LFOs by one block and add the modulation to `curves`
+        ({channel: {field: value or per-sample array}}), which is returned.
+        """
+        # routes first: every LFO they use is then in the LFO set read after
+        src, chans, tgts, depths = self.routes
+        rates, shapes, start = self.lfos
+        if not len(src):
+            return curves
+        phases = self._phases
+        if len(phases) < len(rates):
+            # LFOs added since the last block start at their start phase
+            phases = np.concatenate((phases, start[len(phases):]))
+        step = sound.sr / self.control_rate
+        # control points at the block start, every `step` samples, and the block end
+        points = np.append(np.arange(0, frames, step), frames)
+        values = lfo_values(shapes, phases[:, None] + rates[:, None] * (points / sound.sr))
+        self._phases = (phases + rates * frames / sound.sr) % 1.0
+
+        grid = np.zeros((len(sound.channels), len(TARGETS), len(points)))
+        np.add.at(grid, (chans, tgts), depths[:, None] * values[src])
+        samples = np.arange(frames)
+        for ch, t in set(zip(chans.tolist(), tgts.tolist())):
+            key = TARGETS[t]
+            smooth = key in SMOOTH
+            offset = np.interp(samples, points, grid[ch, t]) if smooth else grid[ch, t, 0]
+            fields = curves.setdefault(ch, {})
+            if key == "pitch":
+                fields["pitch"] = offset
+                continue
+            spec = PARAMS[PARAM_INDEX[key]]
+            lo, span = spec.range
+            base = fields.get(spec.field, sound.params.get(ch, PARAM_INDEX[key]))
+            fields[spec.field] = np.clip(base + offset * span, lo, lo + span)
+        return curves
@@ -0,0 +1,144 @@
+import threading
+from collections import namedtuple
+
+from channel import Waveform
+
+# One entry per editable channel parameter.
+#   key:       short name used by the knob/view/AI code
+#   label:     text drawn in the parameter column
+#   section:   group in the serialized preset (None = top level of the channel)
+#   field:     attribute name on the component, also the serialized key
+#   component: Channel attribute holding the component list (None = the channel itself)
+#   range:     (min, span), a normalized value v maps to min + v * span
+#   steps:     knob quantization steps over the range
+#   row:       display row, in 1/16ths of the screen height
+#   hook:      component method to call after the value changes (DSP coefficient update)
+ParamSpec = namedtuple("ParamSpec", "key label section field component range steps row hook")
+
+PARAMS = (
+    ParamSpec('vol',  'VOL', None,       'volume',        None,        (0.0, 1.0), 100,  2, None),
+    ParamSpec('att',  'ATT', 'envelope', 'attack_time',   'envelopes', (0.0, 1.0), 100,  4, 'update_samples'),
+    ParamSpec('dec',  'DEC', 'envelope', 'decay_time',    'envelopes', (0.0, 1.0), 100,  5, 'update_samples'),
+    ParamSpec('sus',  'SUS', 'envelope', 'sustain_level', 'envelopes', (0.0, 1.0), 100,  6, None),
+    ParamSpec('rel',  'REL', 'envelope', 'release_time',  'envelopes', (0.0, 1.0), 100,  7, 'update_samples'),
+    ParamSpec('L',    'L',   'filter',   'low',           'filters',   (0.0, 1.0), 100,  9, 'update_gains'),
+    ParamSpec('M',    'M',   'filter',   'mid',           'filters',   (0.0, 1.0), 100, 10, 'update_gains'),
+    ParamSpec('H',    'H',   'filter',   'high',          'filters',   (0.0, 1.0), 100, 11, 'update_gains'),
+    ParamSpec('dec2', 'DEC', 'reverb',   'decay',         'reverbs',   (0.0, 1.0),  50, 13, None),
+    ParamSpec('del',  'DEL', 'reverb',   'delay',         'reverbs',   (0.0, 0.2),  50, 14, None),
+    ParamSpec('wet',  'WET', 'reverb',   'wet',           'reverbs',   (0.0, 1.0),  50, 15, None),
+)
+
+WAVE_NAMES = ("saw", "sin", "sqr")
+PARAM_KEYS = tuple(p.key for p in PARAMS)
+PARAM_INDEX = {p.key: i for i, p in enumerate(PARAMS)}
+
+def _bind_channel(channel):
+    """Flat [(target, attr, hook)] table for one channel, in PARAMS order."""
+    table = []
+    for spec in PARAMS:
+        target = channel if spec.component is None else getattr(channel, spec.component)[0]
+        hook = getattr(target, spec.hook) if spec.hook else None
+        table.append((target, spec.field, hook))
+    return table
+
+class ParamBank:
+    """
+    Binding tables for every channel x parameter of a Sound, plus change tracking.
+    All parameter writes (knob, AI, presets) go through set()/apply_dict() so the
+    UI can redraw only the changed cells via pop_changes().
+    """
+    def __init__(self, sound):
+        self.sound = sound
+        self.bindings = []
+        self._channels = None
+        self._changes = set()
+        self._lock = threading.Lock()
+
+    def _tables(self):
+        chans = self.sound.channels
+        if chans is not self._channels or len(self.bindings) != len(chans):
+            self.bindings = [_bind_channel(c) for c in chans]
+            self._channels = chans
+        return self.bindings
+
+    def get(self, ch, i):
+        target, attr, _ = self._tables()[ch][i]
+        return getattr(target, attr)
+
+    def set(self, ch, i, value):
+        """Set parameter i of channel ch; returns True if the value changed."""
+        target, attr, hook = self._tables()[ch][i]
+        if getattr(target, attr) == value:
+            return False
+        setattr(target, attr, value)
+        if hook is not None:
+            hook()
+        with self._lock:
+            self._changes.add((ch, i))
+        return True
+
+    def normalized(self, ch, i):
+        lo, span = PARAMS[i].range
+        return (self.get(ch, i) - lo) / span
+
+    def set_normalized(self, ch, i, v):
+        """Map v in [0, 1] onto the parameter range, quantized to its steps."""
+        spec = PARAMS[i]
+        lo, span = spec.range
+        vq = round(v * spec.steps) / spec.steps
+        return self.set(ch, i, lo + vq * span)
+
+    def pop_changes(self):
+        """Return and clear the set of changed (channel, param index) pairs."""
+        with self._lock:
+            changes, self._changes = self._changes, set()
+        return changes
+
+    def mark_all(self):
+        with self._lock:
+            self._changes.update((ch, i) for ch in range(len(self.sound.channels)) for i in range(len(PARAMS)))
+
+    def to_dict(self, ch):
+        """Serialize one channel in the preset/LLM format."""
+        channel = self.sound.channels[ch]
+        conf = {'waveform': {'name': channel.waveform.name, 'frequency': channel.waveform.frequency}}
+        top = {}
+        for spec, (target, attr, _) in zip(PARAMS, self._tables()[ch]):
+            section = top if spec.section is None else conf.setdefault(spec.section, {})
+            section[spec.field] = getattr(target, attr)
+        conf.update(top)
+        return conf
+
+    def prepare(self, ch, conf):
+        """
+        A clone of channel ch with conf (to_dict() format) applied, built off
+        the audio thread for Sound.apply_preset(). A new frequency gets a new
+        Waveform with the phase carried over proportionally.
+        """
+        channel = self.sound.channels[ch].clone()
+        wf = conf.get('waveform', {})
+        if 'frequency' in wf and float(wf['frequency']) != channel.waveform.frequency:
+            old = channel.waveform
+            channel.waveform = Waveform(old.name, sr=channel.sr, frequency=float(wf['frequency']))
+            channel.phase = int(channel.phase / old.length * channel.waveform.length)
+        for spec, (target, attr, hook) in zip(PARAMS, _bind_channel(channel)):
+            section = conf if spec.section is None else conf.get(spec.section, {})
+            if spec.field in section and float(section[spec.field]) != getattr(target, attr):
+                setattr(target, attr, float(section[spec.field]))
+                if hook is not None:
+                    hook()
+        return channel
+
+    def apply_dict(self, ch, conf):
+        """Apply a channel config in the to_dict() format; missing fields are left alone."""
+        wf = conf.get('waveform', {})
+        if 'frequency' in wf:
+            channel = self.sound.channels[ch]
+            freq = float(wf['frequency'])
+            if freq != channel.waveform.frequency:
+                channel.waveform = Waveform(channel.waveform.name, sr=channel.sr, frequency=freq)
+        for i, spec in enumerate(PARAMS):
+            section = conf if spec.section is None else conf.get(spec.section, {})
+            if spec.field in section:
+                self.set(ch, i, float(section[spec.field]))
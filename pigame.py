@@ -11,13 +11,13 @@ except ImportError:
     support_gpio = False
 from pygame.locals import *
 class PiTft:
-    def __init__(self,rotation:int=-1,v2:bool=False if env['PIGAME_V2']=='off' else True,allow_gpio:bool=True,invertx:bool=True if env['PIGAME_INVERTX']=='on' else False,inverty:bool=True if env['PIGAME_INVERTY']=='on' else False,swapxy:bool=True if env['PIGAME_SWAPXY']=='on' else False,buttons=[False if env['PIGAME_BTN1']=='off' else True,False if env['PIGAME_BTN2']=='off' else True,False if env['PIGAME_BTN3']=='off' else True,False if env['PIGAME_BTN4']=='off' else True]):
+    def __init__(self,rotation:int=-1,v2:bool=False if env['PIGAME_V2']=='off' else True,allow_gpio:bool=True,invertx:bool=True if env['PIGAME_INVERTX']=='on' else False,inverty:bool=True if env['PIGAME_INVERTY']=='on' else False,swapxy:bool=True if env['PIGAME_SWAPXY']=='on' else False,buttons=[False if env['PIGAME_BTN1']=='off' else True,False if env['PIGAME_BTN2']=='off' else True,False if env['PIGAME_BTN3']=='off' else True,False if env['PIGAME_BTN4']=='off' else True],on_event=None):
         self.use_gpio = support_gpio and allow_gpio and not (os.getenv('PIGAME_GPIO') == 'off')
         if not self.use_gpio:
             buttons=[False,False,False,False]
         if rotation == -1:
             rotation = int(defaultrot)
-        self.pitft=pitft_touchscreen.pitft_touchscreen()
+        self.pitft=pitft_touchscreen.pitft_touchscreen(on_event=on_event)
         self.pitft.button_down=False
         self.pitft.pigameapi=2
         self.pitft.pigamerotr=rotation
@@ -50,48 +50,54 @@ class PiTft:
             GPIO.setup(self.__pin4, GPIO.IN, pull_up_down=GPIO.PUD_UP)
             self.__b4 = True
         self.pitft.start()
+    def _transform(self,x,y):
+        """Map raw touchscreen coordinates to screen coordinates."""
+        e={"x":y,"y":x}
+        if self.pitft.pigamerotr==90:
+            e={"x":e["x"],"y":240-e["y"]}
+        elif self.pitft.pigamerotr==270:
+            e={"x":320-e["x"],"y":e["y"]}
+        else:
+            raise(Exception("PiTft rotation is unsupported"))
+        if self.invertx:
+            e={"x":320-e["x"],"y":e["y"]}
+        if self.inverty:
+            e={"y":240-e["y"],"x":e["x"]}
+        if self.swapxy:
+            e={"x":e["y"],"y":e["x"]}
+        return (e["x"],e["y"])
     def update(self):
-        """Add Touchscreen Events to PyGame event queue."""
-        while not self.pitft.queue_empty():
-            for r in self.pitft.get_event():
-                e={"y":(r["x"] if r["x"] else self.cachedpos[0]),"x":(r["y"] if r["y"] else self.cachedpos[1])}
-                rel=(e["x"] - self.cachedpos[0],e["y"] - self.cachedpos[1])
-                self.cachedpos=(e["x"],e["y"])
-                if self.pitft.pigamerotr==90:
-                    e={"x":e["x"],"y":240-e["y"]}
-                    rel=(rel[0],240-rel[1])
-                elif self.pitft.pigamerotr==270:
-                    e={"x":320-e["x"],"y":e["y"]}
-                    rel=(320-rel[0],rel[1])
-                else:
-                    raise(Exception("PiTft rotation is unsupported"))
-                d={}
-                t=MOUSEBUTTONUP if r["touch"]==0 else (MOUSEMOTION if self.pitft.button_down else MOUSEBUTTONDOWN)
-                if self.invertx:
-                    e={"x":320-e["x"],"y":e["y"]}
-                    rel=(320-rel[0],rel[1])
-                if self.inverty:
-                    rel=(rel[0],240-rel[1])
-                    e={"y":240-e["y"],"x":e["x"]}
-                if self.swapxy:
-                    rel=(rel[1],rel[0])
-                    e={"x":e["y"],"y":e["x"]}
-                if t==MOUSEBUTTONDOWN:
-                    d["button"]=1
-                    d["pos"]=(e["x"],e["y"])
-                    self.pitft.button_down = True
-                    pygame.mouse.set_pos(e["x"],e["y"])
-                elif t==MOUSEBUTTONUP:
-                    self.pitft.button_down = False
-                    d["button"]=1
-                    d["pos"]=(e["x"],e["y"])
-                else:
-                    d["buttons"]=(True,False,False)
-                    d["rel"]=rel
-                    d["pos"]=(e["x"],e["y"])
-                    pygame.mouse.set_pos(e["x"],e["y"])
-                pe=pygame.event.Event(t,d)
-                pygame.event.post(pe)
+        """Add Touchscreen Events to PyGame event queue.
+        All pending batches are drained at once; consecutive moves collapse
+        into the latest position and the cursor is moved once per call."""
+        pos=None
+        pending_move=None
+        for kind,x,y,t in self.pitft.get_batches():
+            pos=self._transform(x,y)
+            if kind==pitft_touchscreen.TOUCH_MOVE:
+                if pending_move is None:
+                    pending_move=[pos,self.cachedpos,t]
+                pending_move[0]=pos
+                pending_move[2]=t
+                continue
+            if pending_move is not None:
+                self._post_move(*pending_move)
+                pending_move=None
+            if kind==pitft_touchscreen.TOUCH_DOWN:
+                self.pitft.button_down=True
+                pygame.event.post(pygame.event.Event(MOUSEBUTTONDOWN,{"button":1,"pos":pos,"time":t}))
+            else:
+                self.pitft.button_down=False
+                pygame.event.post(pygame.event.Event(MOUSEBUTTONUP,{"button":1,"pos":pos,"time":t}))
+            self.cachedpos=pos
+        if pending_move is not None:
+            self._post_move(*pending_move)
+        if pos is not None:
+            pygame.mouse.set_pos(*pos)
+    def _post_move(self,pos,start,t):
+        rel=(pos[0]-start[0],pos[1]-start[1])
+        pygame.event.post(pygame.event.Event(MOUSEMOTION,{"buttons":(True,False,False),"rel":rel,"pos":pos,"time":t}))
+        self.cachedpos=pos
     def __del__(self):
         """Cleaning up Touchscreen events and Threads when the Object destroyed."""
         self.pitft.stop()
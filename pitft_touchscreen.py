@@ -8,6 +8,7 @@ try:
 except ImportError:
     print("Evdev package is not installed.  Run 'pip3 install evdev' or 'pip install evdev' (Python 2.7) to install.")
     raise(ImportError("Evdev package not found."))
+import select
 import threading
 try:
     # python 3.5+
@@ -16,13 +17,18 @@ except ImportError:
     # python 2.7
     import Queue as queue
 
+# kinds of the compact touch event tuples
+TOUCH_UP, TOUCH_DOWN, TOUCH_MOVE = 0, 1, 2
+
 
 # Class for handling events from piTFT
 class pitft_touchscreen(threading.Thread):
-    def __init__(self, device_path=os.getenv("PIGAME_TS") or "/dev/input/touchscreen", grab=False):
+    def __init__(self, device_path=os.getenv("PIGAME_TS") or "/dev/input/touchscreen", grab=False, on_event=None):
         super(pitft_touchscreen, self).__init__()
         self.device_path = device_path
         self.grab = grab
+        # optional callable, invoked from the reader thread after each queued batch
+        self.on_event = on_event
         self.events = queue.Queue()
         self.shutdown = threading.Event()
 
@@ -50,59 +56,74 @@ class pitft_touchscreen(threading.Thread):
         finally:
             if device is None:
                 self.shutdown.set()
-        # Loop for getting evdev events
-        event = {'time': None, 'id': None, 'x': None, 'y': None, 'touch': None}
+        # Loop for getting evdev events: wait for the fd, then drain everything
+        # pending with a non-blocking read and queue it as one batch of
+        # (kind, x, y, time) tuples, with consecutive moves coalesced.
+        x = y = None
+        touch = None
+        down = False
         dropping = False
         while not self.shutdown.is_set():
-            for input_event in device.read_loop():
-                if input_event.type == evdev.ecodes.EV_ABS:
-                    if input_event.code == evdev.ecodes.ABS_X:
-                        event['x'] = input_event.value
-                    elif input_event.code == evdev.ecodes.ABS_Y:
-                        event['y'] = input_event.value
-                    elif input_event.code == evdev.ecodes.ABS_MT_TRACKING_ID:
-                        event['id'] = input_event.value
-                        if input_event.value == -1:
-                            event['x'] = None
-                            event['y'] = None
-                            event['touch'] = None
-                    elif input_event.code == evdev.ecodes.ABS_MT_POSITION_X:
-                        pass
-                    elif input_event.code == evdev.ecodes.ABS_MT_POSITION_Y:
-                        pass
-                elif input_event.type == evdev.ecodes.EV_KEY:
-                    event['touch'] = input_event.value
-                elif input_event.type == evdev.ecodes.SYN_REPORT:
-                    if dropping:
-                        event['x'] = None
-                        event['y'] = None
-                        event['touch'] = None
-                        dropping = False
-                    else:
-                        event['time'] = input_event.timestamp()
-                        self.events.put(event)
-                        e = event
-                        event = {'x': e['x'], 'y': e['y']}
-                        try:
-                            event['id'] = e['id']
-                        except KeyError:
-                            event['id'] = None
-                        try:
-                            event['touch'] = e['touch']
-                        except KeyError:
-                            event['touch'] = None
-                elif input_event.type == evdev.ecodes.SYN_DROPPED:
-                    dropping = True
+            readable, _, _ = select.select([device.fd], [], [], 0.1)
+            if not readable:
+                continue
+            batch = []
+            try:
+                for input_event in device.read():
+                    if input_event.type == evdev.ecodes.EV_ABS:
+                        if input_event.code == evdev.ecodes.ABS_X:
+                            x = input_event.value
+                        elif input_event.code == evdev.ecodes.ABS_Y:
+                            y = input_event.value
+                    elif input_event.type == evdev.ecodes.EV_KEY:
+                        touch = input_event.value
+                    elif input_event.type == evdev.ecodes.SYN_REPORT:
+                        if dropping:
+                            touch = None
+                            dropping = False
+                            continue
+                        if x is None or y is None:
+                            continue
+                        if touch == 1:
+                            kind = TOUCH_MOVE if down else TOUCH_DOWN
+                            down = True
+                        elif touch == 0 and down:
+                            kind = TOUCH_UP
+                            down = False
+                        else:
+                            continue
+                        ev = (kind, x, y, input_event.timestamp())
+                        if kind == TOUCH_MOVE and batch and batch[-1][0] == TOUCH_MOVE:
+                            batch[-1] = ev
+                        else:
+                            batch.append(ev)
+                    elif input_event.type == evdev.ecodes.SYN_DROPPED:
+                        dropping = True
+            except BlockingIOError:
+                pass
+            if batch:
+                self.events.put(batch)
+                if self.on_event is not None:
+                    self.on_event()
         if self.grab:
             device.ungrab()
 
     def get_event(self):
-        if not self.events.empty():
-            event = self.events.get()
-            yield event
-        else:
+        """Yield the next queued batch of (kind, x, y, time) tuples, or None."""
+        try:
+            yield self.events.get_nowait()
+        except queue.Empty:
             yield None
 
+    def get_batches(self):
+        """Drain every queued batch into one list of (kind, x, y, time) tuples."""
+        events = []
+        while True:
+            try:
+                events.extend(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
     def queue_empty(self):
         return self.events.empty()
 
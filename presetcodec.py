@@ -0,0 +1,85 @@
+import numpy as np
+
+from params import PARAMS, PARAM_KEYS, WAVE_NAMES
+
+# Compact preset encoding for the synth LLM: one row per channel (in
+# WAVE_NAMES order) of 12 numbers, the oscillator frequency followed by the
+# registered parameters. The same table goes out in the prompt and comes
+# back in the response.
+COLUMNS = ("freq",) + PARAM_KEYS
+FREQ_RANGE = (20.0, 8000.0)
+LOWS = np.array([FREQ_RANGE[0]] + [spec.range[0] for spec in PARAMS])
+HIGHS = np.array([FREQ_RANGE[1]] + [spec.range[0] + spec.range[1] for spec in PARAMS])
+
+# Structured-output schema for the response; keys are generated in this order,
+# so "description" streams out before the channel rows.
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "exit": {"type": "integer", "enum": [0, 1]},
+        "description": {"type": "string"},
+        "channels": {
+            "type": "array",
+            "items": {"type": "array", "items": {"type": "number"}},
+        },
+    },
+    "required": ["exit", "description", "channels"],
+    "additionalProperties": False,
+}
+
+def ranges_text():
+    """'freq 20-8000, vol 0-1, ...' for the system prompt."""
+    return ", ".join(f"{c} {lo:g}-{hi:g}" for c, lo, hi in zip(COLUMNS, LOWS, HIGHS))
+
+def to_rows(params):
+    """get_current_params() list -> rows of COLUMNS values."""
+    rows = []
+    for conf in params:
+        row = [float(conf["waveform"]["frequency"])]
+        for spec in PARAMS:
+            section = conf if spec.section is None else conf[spec.section]
+            row.append(float(section[spec.field]))
+        rows.append(row)
+    return rows
+
+def encode_params(params):
+    """get_current_params() list -> compact whitespace table for the prompt."""
+    lines = ["wave " + " ".join(COLUMNS)]
+    for conf, row in zip(params, to_rows(params)):
+        lines.append(conf["waveform"]["name"] + " " + " ".join(f"{round(v, 3):g}" for v in row))
+    return "\n".join(lines)
+
+def clamp_rows(rows):
+    """
+    Validate response rows in one vectorized pass: shape (n, 12), non-finite
+    values replaced by the range minimum, everything clipped to its range.
+    Returns (array, number of values that were out of range).
+    """
+    arr = np.asarray(rows, dtype=float)
+    if arr.ndim != 2 or arr.shape[1] != len(COLUMNS):
+        raise ValueError(f"expected rows of {len(COLUMNS)} values, got shape {arr.shape}")
+    finite = np.isfinite(arr)
+    arr = np.where(finite, arr, LOWS)
+    clipped = np.clip(arr, LOWS, HIGHS)
+    return clipped, int(np.count_nonzero(clipped != arr) + np.count_nonzero(~finite))
+
+def row_to_conf(i, row):
+    """One validated row -> channel config in the ParamBank.to_dict() format."""
+    conf = {"waveform": {"name": WAVE_NAMES[i], "frequency": float(row[0])}}
+    top = {}
+    for spec, value in zip(PARAMS, row[1:]):
+        section = top if spec.section is None else conf.setdefault(spec.section, {})
+        section[spec.field] = float(value)
+    conf.update(top)
+    return conf
+
+def decode_channels(rows):
+    """Response rows -> (list of channel configs, number of clamped values)."""
+    if not len(rows):
+        # an exit reply carries no channels
+        return [], 0
+    if rows and all(isinstance(r, dict) for r in rows):
+        # already in the nested format (older cache entries)
+        return rows, 0
+    arr, clamped = clamp_rows(rows)
+    return [row_to_conf(i, row) for i, row in enumerate(arr[:len(WAVE_NAMES)])], clamped
@@ -0,0 +1,204 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+import presetcodec
+from channel import Waveform, Envelope, Filter, Reverb, Channel
+from params import WAVE_NAMES
+from sound import Sound
+from vocab import WAVE_WORDS
+
+RENDER_SR = 22050
+RENDER_BLOCK = 1024
+HOLD = 1.0          # seconds of note on in the offline render
+TAIL = 0.5          # seconds after note off
+RMS_POINTS = 16     # RMS envelope resolution
+FEATURE_DIM = 3 * len(presetcodec.COLUMNS) + 1 + RMS_POINTS
+
+def default_sound(sr=RENDER_SR, quiet=False):
+    """The three-channel patch main.py starts with, every channel audible."""
+    sound = Sound(sr=sr)
+    for name in WAVE_NAMES:
+        sound.add_channel(Channel(Waveform(name, sr=sr), Envelope(sr=sr, quiet=quiet), Filter(sr=sr),
+                                  Reverb(sr=sr), sr=sr))
+    return sound
+
+def render(channels, sr=RENDER_SR, automation=None):
+    """
+    Offline render of a preset: HOLD seconds of note on, then TAIL of release.
+    automation: optional automation.Automation whose take is played from the
+                top during the render; the object itself is left untouched
+    """
+    sound = default_sound(sr, quiet=True)
+    for i, conf in enumerate(channels):
+        sound.params.apply_dict(i, conf)
+    if automation is not None:
+        sound.automation = automation.copy()
+        sound.automation.play(loop=False)
+    blocks = []
+    sound.note_on()
+    for b in range(int((HOLD + TAIL) * sr) // RENDER_BLOCK):
+        if b == int(HOLD * sr) // RENDER_BLOCK:
+            sound.note_off()
+        blocks.append(sound.process(RENDER_BLOCK))
+    return np.concatenate(blocks)
+
+def audio_features(sig, sr=RENDER_SR):
+    """(spectral centroid in Hz, RMS envelope of RMS_POINTS segments), computed blockwise."""
+    frames = sig[:len(sig) // RENDER_BLOCK * RENDER_BLOCK].reshape(-1, RENDER_BLOCK)
+    mag = np.abs(np.fft.rfft(frames * np.hanning(RENDER_BLOCK), axis=1))
+    freqs = np.fft.rfftfreq(RENDER_BLOCK, 1 / sr)
+    energy = mag.sum(axis=1)
+    # energy-weighted mean of the per-frame centroids, silent frames drop out
+    centroid = float((mag @ freqs).sum() / energy.sum()) if energy.sum() > 0 else 0.0
+    segments = np.array_split(sig, RMS_POINTS)
+    rms = np.array([np.sqrt(np.mean(s ** 2)) for s in segments])
+    return centroid, rms
+
+def feature_vector(channels, sig=None):
+    """
+    Fixed-length vector for a preset: the 3x12 parameter table normalized to
+    [0, 1] (frequency on a log scale), the log spectral centroid and the RMS
+    envelope of an offline render.
+    """
+    arr, _ = presetcodec.clamp_rows(presetcodec.to_rows(channels))
+    norm = (arr - presetcodec.LOWS) / (presetcodec.HIGHS - presetcodec.LOWS)
+    lo, hi = presetcodec.FREQ_RANGE
+    norm[:, 0] = np.log(arr[:, 0] / lo) / np.log(hi / lo)
+    centroid, rms = audio_features(render(channels) if sig is None else sig)
+    centroid = np.log1p(centroid) / np.log1p(RENDER_SR / 2)
+    return np.concatenate((norm.ravel(), [centroid], np.minimum(rms, 1.0))).astype(np.float32)
+
+def normalize_channels(channels):
+    """
+    Map a loosely formatted channel list (other waveform spellings, any order,
+    missing channels) onto the saw/sin/sqr layout; missing channels are muted.
+    """
+    base = default_sound(RENDER_SR)
+    out = [base.params.to_dict(i) for i in range(len(WAVE_NAMES))]
+    for conf in out:
+        conf["volume"] = 0.0
+    for conf in channels:
+        name = WAVE_WORDS.get(str(conf.get("waveform", {}).get("name", "")).lower())
+        if name is None:
+            continue
+        slot = out[WAVE_NAMES.index(name)]
+        for key, value in conf.items():
+            if isinstance(value, dict) and isinstance(slot.get(key), dict):
+                slot[key].update({k: v for k, v in value.items() if k in slot[key]})
+            elif key in slot and not isinstance(slot[key], dict):
+                slot[key] = value
+        slot["waveform"]["name"] = name
+    arr, _ = presetcodec.clamp_rows(presetcodec.to_rows(out))
+    return [presetcodec.row_to_conf(i, row) for i, row in enumerate(arr)]
+
+class PresetLibrary:
+    """
+    Presets in a local SQLite file, each with a FEATURE_DIM feature vector.
+    The vectors are also kept in one in-memory matrix, so nearest() is a
+    single vectorized distance computation over the whole library.
+    """
+    def __init__(self, path="presets.db"):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS presets (
+            id INTEGER PRIMARY KEY,
+            created REAL,
+            description TEXT,
+            channels TEXT,
+            features BLOB)""")
+        self.db.commit()
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue()
+        threading.Thread(target=self._add_loop, daemon=True).start()
+        rows = self.db.execute("SELECT id, features FROM presets ORDER BY id").fetchall()
+        self.ids = np.array([r[0] for r in rows], dtype=np.int64)
+        self.matrix = np.empty((max(len(rows), 64), FEATURE_DIM), dtype=np.float32)
+        for i, (_, blob) in enumerate(rows):
+            self.matrix[i] = np.frombuffer(blob, dtype=np.float32)
+        self.count = len(rows)
+        # parameters weigh as much as the audio features in the distance
+        self.weights = np.ones(FEATURE_DIM, dtype=np.float32)
+        self.weights[:3 * len(presetcodec.COLUMNS)] = (1 + RMS_POINTS) / (3 * len(presetcodec.COLUMNS))
+
+    def __len__(self):
+        return self.count
+
+    def add(self, channels, description=""):
+        """Store a preset (rendered here for its features); returns its id."""
+        channels = normalize_channels(channels)
+        vec = feature_vector(channels)
+        with self._lock:
+            cur = self.db.execute(
+                "INSERT INTO presets (created, description, channels, features) VALUES (?, ?, ?, ?)",
+                (time.time(), description, json.dumps(channels), vec.tobytes()))
+            self.db.commit()
+            if self.count == len(self.matrix):
+                self.matrix = np.concatenate((self.matrix, np.empty_like(self.matrix)))
+            self.matrix[self.count] = vec
+            self.ids = np.append(self.ids, cur.lastrowid)
+            self.count += 1
+            return cur.lastrowid
+
+    def _add_loop(self):
+        while True:
+            channels, description = self._jobs.get()
+            try:
+                self.add(channels, description)
+            except Exception as e:
+                print("Preset library add failed:", repr(e))
+            finally:
+                self._jobs.task_done()
+
+    def add_async(self, channels, description=""):
+        """Queue add() for the library's worker thread; the offline render stays off the caller."""
+        self._jobs.put((channels, description))
+
+    def flush(self):
+        """Wait until every queued preset is stored."""
+        self._jobs.join()
+
+    def get(self, preset_id):
+        """{'id', 'description', 'channels'} or None."""
+        with self._lock:
+            row = self.db.execute("SELECT id, description, channels FROM presets WHERE id = ?",
+                                  (int(preset_id),)).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "description": row[1], "channels": json.loads(row[2])}
+
+    def nearest(self, channels=None, vector=None, k=5):
+        """The k closest presets as [(id, distance)], to a channel list or a feature vector."""
+        if vector is None:
+            vector = feature_vector(normalize_channels(channels))
+        with self._lock:
+            m = self.matrix[:self.count]
+            d = ((m - vector) ** 2) @ self.weights
+            ids = self.ids
+        k = min(k, len(d))
+        if k == 0:
+            return []
+        idx = np.argpartition(d, k - 1)[:k]
+        idx = idx[np.argsort(d[idx])]
+        return [(int(ids[i]), float(np.sqrt(d[i]))) for i in idx]
+
+    def similar_to(self, preset_id, k=5):
+        """Presets that sound like an existing one (the preset itself excluded)."""
+        with self._lock:
+            pos = np.flatnonzero(self.ids == preset_id)
+            vector = self.matrix[pos[0]].copy() if len(pos) else None
+        if vector is None:
+            return []
+        return [r for r in self.nearest(vector=vector, k=k + 1) if r[0] != preset_id][:k]
+
+    def import_json(self, paths):
+        """Add presets from JSON files with 'channels' (and 'description'); returns the new ids."""
+        ids = []
+        for path in paths:
+            with open(path) as f:
+                data = json.load(f)
+            ids.append(self.add(data["channels"], data.get("description", "")))
+        return ids
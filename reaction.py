@@ -1,131 +1,365 @@
-import sounddevice as sd
 import numpy as np
-import scipy.io.wavfile as wav
-import tempfile
-import openai
+import io
 import json
-import os
 import time
+import wave
 import subprocess
-from vosk import Model, KaldiRecognizer
-import tempfile
+import asyncio
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, CancelledError, wait, FIRST_COMPLETED
+from resample import PolyphaseResampler
+from vad import VoiceActivityDetector
+import presetcodec
+# openai, vosk and sounddevice are imported where they are first needed, so
+# importing this module (and starting the synth) never waits on them
 
 # ------------ Synth LLM Config ------------
 
-SYSTEM_PROMPT = """You are a professional synthesizer sound designer assistant.
-
-Your job is: based on a user's natural language description of the desired sound characteristics (such as tone, feeling, attack speed, reverb strength, etc.), infer appropriate synthesizer parameters, and generate a full JSON configuration, as follows:
-
-- Output an overall "description" field (a short 1-2 sentence natural language description summarizing the intended sound character based on the user's input).
-- Then output a "channels" field, which is a list of 3 sound channels, each configured as below:
-  - The first channel must always use waveform "saw"
-  - The second channel must always use waveform "sin"
-  - The third channel must always use waveform "sqr"
-
-Each channel must contain:
-- waveform (name fixed + frequency matching the description if specified)
-- envelope (attack_time, decay_time, sustain_level, release_time)
-- filter (low, mid, high gain settings)
-- reverb (decay, delay, wet)
-- volume
-
-The range of each parameter is as follows:
-- attack_time: 0.0 to 1.0
-- decay_time: 0.0 to 1.0
-- sustain_level: 0.0 to 1.0
-- release_time: 0.0 to 1.0
-- low: 0.0 to 1.0
-- mid: 0.0 to 1.0
-- high: 0.0 to 1.0
-- decay: 0.0 to 1.0
-- delay: 0.0 to 0.2
-- wet: 0.0 to 1.0
-- volume: 0.0 to 1.0
-
-If the user specifies tone (e.g., "punchy", "smooth", "ambient"), modify attack, decay, reverb, and volume accordingly to match the feel.
-If the user specifies a frequency, apply it uniformly across all channels unless otherwise indicated.
-If the user implies to that the parameter is right and want exit, set exit to 1, oherwise set it to 0.
-
-Notice:
-- The input of user is retrieved from a microphone, so the text may be inaccurate. Please notice this and try get the user's meaning as much as you can.
-- You are able to set different parameters for saw, sin and sqr waveforms. Just do your best to make the sound as close to the user's description as possible.
-
-Example structure:
-
-{
-  "exit": 0,
-  "description": "A punchy and ambient preset with fast attack and rich reverb, suitable for energetic leads.",
-  "channels": [
-    {
-      "waveform": {
-        "name": "saw",
-        "frequency": 440.0
-      },
-      "envelope": {
-        "attack_time": 0.1,
-        "decay_time": 0.3,
-        "sustain_level": 0.7,
-        "release_time": 0.4
-      },
-      "filter": {
-        "low": 1.0,
-        "mid": 0.8,
-        "high": 1.2
-      },
-      "reverb": {
-        "decay": 0.5,
-        "delay": 0.1,
-        "wet": 0.3
-      },
-      "volume": 0.8
-    },
-    ...
-  ]
-}
-
-Only output valid JSON.
+SYSTEM_PROMPT = f"""You are a synthesizer sound designer. Turn the user's description of a sound into parameters for a 3-channel synth (saw, sin, sqr).
+
+Parameters are a table with one row per channel, in saw, sin, sqr order, of 12 numbers in this column order:
+{" ".join(presetcodec.COLUMNS)}
+freq: oscillator Hz; vol: channel volume; att, dec, rel: envelope attack/decay/release seconds; sus: sustain level; L M H: low/mid/high filter gains; dec2: reverb decay; del: reverb pre-delay seconds; wet: reverb mix.
+Ranges: {presetcodec.ranges_text()}.
+
+Match tone words (punchy, smooth, ambient...) with envelope, filter and reverb. Apply a requested frequency to all channels unless told otherwise. The request comes from speech recognition and may contain errors; infer the meaning.
+
+Reply with JSON: "exit" (1 if the user is happy and wants to leave, else 0), "description" (1-2 sentences on the resulting sound), "channels" (the 3 rows).
 """
 
 # ------------ Classes ------------
 
+class StreamingPresetParser:
+    """
+    Incremental scanner for the synth LLM's JSON object.
+    feed() text chunks as they arrive; callbacks fire as soon as
+    - a top-level field's value is complete: on_field(key, value)
+    - an element of the top-level "channels" list closes: on_channel(index, value)
+    Anything before the opening brace (e.g. a code fence) is ignored.
+    """
+    def __init__(self, on_field=None, on_channel=None):
+        self.on_field = on_field
+        self.on_channel = on_channel
+        self.text = ""
+        self.result = {}
+        self.done = False
+        self.stack = []
+        self.in_string = False
+        self.escape = False
+        self.token_start = None   # start of the current string at depth 1
+        self.pending_key = None   # key read, waiting for ':'
+        self.key = None           # key whose value we are reading
+        self.value_start = None
+        self.elem_start = None
+        self.n_channels = 0
+
+    def _emit_field(self, end):
+        value = json.loads(self.text[self.value_start:end])
+        self.result[self.key] = value
+        if self.on_field is not None:
+            self.on_field(self.key, value)
+        self.key = None
+        self.value_start = None
+
+    def feed(self, chunk):
+        start = len(self.text)
+        self.text += chunk
+        text = self.text
+        for i in range(start, len(text)):
+            if self.done:
+                return
+            c = text[i]
+            depth = len(self.stack)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == '\\':
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+                    if depth == 1:
+                        if self.key is not None and self.value_start is not None:
+                            self._emit_field(i + 1)
+                        else:
+                            self.pending_key = json.loads(text[self.token_start:i + 1])
+                continue
+            if depth == 0:
+                if c == '{':
+                    self.stack.append(c)
+                continue
+            if c == '"':
+                self.in_string = True
+                if depth == 1:
+                    self.token_start = i
+                    if self.key is not None and self.value_start is None:
+                        self.value_start = i
+            elif c in '{[':
+                if depth == 1 and self.key is not None and self.value_start is None:
+                    self.value_start = i
+                elif depth == 2 and self.key == "channels" and self.stack[-1] == '[':
+                    self.elem_start = i
+                self.stack.append(c)
+            elif c in '}]':
+                self.stack.pop()
+                depth -= 1
+                if depth == 2 and self.elem_start is not None:
+                    value = json.loads(text[self.elem_start:i + 1])
+                    if self.on_channel is not None:
+                        self.on_channel(self.n_channels, value)
+                    self.n_channels += 1
+                    self.elem_start = None
+                elif depth == 1 and self.value_start is not None:
+                    self._emit_field(i + 1)
+                elif depth == 0:
+                    if self.value_start is not None:
+                        self._emit_field(i)
+                    self.done = True
+            elif depth == 1:
+                if c == ':':
+                    self.key, self.pending_key = self.pending_key, None
+                    self.value_start = None
+                elif c == ',':
+                    if self.value_start is not None:
+                        self._emit_field(i)
+                    self.key = None
+                elif not c.isspace() and self.key is not None and self.value_start is None:
+                    # number / true / false / null
+                    self.value_start = i
+
 class LLMClient:
-    def __init__(self, api_key_path, model="gpt-4o-mini"):
+    def __init__(self, api_key_path, model="gpt-4o-mini", base_url=None,
+                 timeout=10.0, hedge=True, hedge_percentile=90, hedge_after=2.0):
+        """
+        base_url:         optional OpenAI-compatible endpoint (e.g. a local stand-in server)
+        timeout:          latency budget in seconds for a whole call, hedge included;
+                          also the per-read timeout of the HTTP client
+        hedge:            send a second, identical request when the first has not
+                          answered within the hedge delay; the first answer wins
+        hedge_percentile: hedge delay as this percentile of recent latencies
+                          (time to first chunk when streaming)
+        hedge_after:      hedge delay until enough latencies have been seen
+        """
         with open(api_key_path, 'r') as f:
             self.api_key = f.read().strip()
         if not self.api_key:
             raise ValueError("API key not found.")
         self.model = model
-        self.client = openai.OpenAI(api_key=self.api_key)
-
-    def gen_resp(self, prompt):
-        response = self.client.chat.completions.create(
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_after = hedge_after
+        self.latencies = {"blocking": deque(maxlen=50), "stream": deque(maxlen=50)}
+        self.stats = {"calls": 0, "hedged": 0, "hedge_won": 0, "failed": 0, "timeouts": 0, "aborted": 0}
+        import openai
+        # one client, so every call reuses its pooled keep-alive connections;
+        # retries are replaced by the hedge, which stays inside the budget
+        self.client = openai.OpenAI(api_key=self.api_key, base_url=base_url,
+                                    timeout=timeout, max_retries=0)
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm")
+
+    def _messages(self, prompt):
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    # constrain the reply to the compact preset schema
+    RESPONSE_FORMAT = {
+        "type": "json_schema",
+        "json_schema": {"name": "synth_preset", "strict": True, "schema": presetcodec.RESPONSE_SCHEMA},
+    }
+
+    def _create(self, prompt, stream=False):
+        return self.client.chat.completions.create(
             model=self.model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1500,
-            temperature=0.7
+            messages=self._messages(prompt),
+            max_tokens=400,
+            temperature=0.7,
+            response_format=self.RESPONSE_FORMAT,
+            stream=stream
         )
+
+    def hedge_delay(self, kind):
+        """Seconds to wait for the first request before hedging, from recent latencies."""
+        lat = self.latencies[kind]
+        if len(lat) < 5:
+            return self.hedge_after
+        return min(max(float(np.percentile(lat, self.hedge_percentile)), 0.2), self.timeout / 2)
+
+    def _race(self, kind, attempt, abort=None, discard=None):
+        """
+        Run attempt() on the pool within the latency budget, hedged: a second
+        attempt starts after hedge_delay(), or at once if the first fails, and
+        the first success is returned. A late loser's result goes to discard().
+        Raises TimeoutError past the budget, CancelledError when abort is set,
+        or the last attempt's error.
+        """
+        self.stats["calls"] += 1
+        t0 = time.monotonic()
+        deadline = t0 + self.timeout
+        hedge_at = t0 + self.hedge_delay(kind) if self.hedge else None
+        pending = [self._pool.submit(attempt)]
+        first = pending[0]
+        error = None
+        try:
+            while True:
+                for f in [f for f in pending if f.done()]:
+                    pending.remove(f)
+                    if f.exception() is None:
+                        self.latencies[kind].append(time.monotonic() - t0)
+                        if f is not first:
+                            self.stats["hedge_won"] += 1
+                        return f.result()
+                    error = f.exception()
+                    print(f"LLM request failed: {error}")
+                if abort is not None and abort.is_set():
+                    self.stats["aborted"] += 1
+                    raise CancelledError("LLM call aborted")
+                now = time.monotonic()
+                if now >= deadline:
+                    self.stats["timeouts"] += 1
+                    raise TimeoutError(f"no LLM response within {self.timeout:.1f} s")
+                if hedge_at is not None and (now >= hedge_at or not pending):
+                    print(f"Hedging LLM request after {now - t0:.2f} s")
+                    self.stats["hedged"] += 1
+                    pending.append(self._pool.submit(attempt))
+                    hedge_at = None
+                elif not pending:
+                    self.stats["failed"] += 1
+                    raise error
+                # short waits, so abort is noticed quickly
+                wait(pending, timeout=min(0.05, deadline - now), return_when=FIRST_COMPLETED)
+        finally:
+            # attempts still running finish in the background (bounded by the
+            # client timeout) and their results are dropped
+            for f in pending:
+                if discard is not None:
+                    f.add_done_callback(lambda f: f.exception() is None and discard(f.result()))
+
+    def gen_resp(self, prompt, abort=None):
+        response = self._race("blocking", lambda: self._create(prompt), abort)
         return json.loads(response.choices[0].message.content)
 
-def call_synth_llm(llm: LLMClient, prompt: str) -> dict:
+    def gen_resp_stream(self, prompt, on_field=None, on_channel=None, abort=None):
+        """
+        Like gen_resp, but streams the completion and reports each top-level
+        field / channel config through the callbacks as soon as it is complete.
+        The hedge races the requests to their first content chunk.
+        """
+        def attempt():
+            stream = self._create(prompt, stream=True)
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    return stream, chunk.choices[0].delta.content
+            stream.close()
+            raise ValueError("LLM stream ended without content")
+
+        deadline = time.monotonic() + self.timeout
+        stream, first = self._race("stream", attempt, abort, discard=lambda r: r[0].close())
+        parser = StreamingPresetParser(on_field, on_channel)
+        try:
+            parser.feed(first)
+            for chunk in stream:
+                if abort is not None and abort.is_set():
+                    self.stats["aborted"] += 1
+                    raise CancelledError("LLM call aborted")
+                if time.monotonic() > deadline:
+                    self.stats["timeouts"] += 1
+                    raise TimeoutError(f"LLM stream not finished within {self.timeout:.1f} s")
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parser.feed(delta)
+        finally:
+            stream.close()
+        if not parser.done:
+            raise ValueError("Incomplete JSON in streamed LLM response")
+        return parser.result
+
+def build_synth_prompt(params, user_text: str) -> str:
+    """User message sent to the synth LLM for the current parameters and request."""
+    return f"Current:\n{presetcodec.encode_params(params)}\nRequest: {user_text}"
+
+def call_synth_llm(llm: LLMClient, user_text: str, params: list, cache=None,
+                   on_field=None, on_channel=None, abort=None) -> dict:
     """
-    Send `prompt` to your LLMClient.gen_resp, return dict with:
+    Ask the LLM for a preset given the transcript and Sound.get_current_params(),
+    return dict with:
      - exit (0/1)
      - description (str)
-     - channels (list of channel configs)
+     - channels (list of channel configs, decoded from the compact rows the
+       LLM answers with and clamped to the parameter ranges)
+    cache: optional llmcache.ResponseCache consulted before, and filled after, the call.
+    on_field / on_channel: if given, the response is streamed and each top-level
+    field / channel config is reported as soon as it is complete (cache hits
+    replay them immediately).
+    abort: optional threading.Event that cancels the request when set.
+    A failed, timed-out or aborted call returns an exit response with an "error" key.
     """
+    streaming = on_field is not None or on_channel is not None
+    if cache is not None:
+        resp = cache.get(user_text, params)
+        if resp is not None:
+            for k, v in resp.items():
+                if k == "channels" and on_channel is not None:
+                    for i, conf in enumerate(v):
+                        on_channel(i, conf)
+                if on_field is not None:
+                    on_field(k, v)
+            return resp
+    def row_to_channel(i, row):
+        # a streamed channel row, validated on its own
+        if on_channel is not None and i < len(presetcodec.WAVE_NAMES):
+            arr, _ = presetcodec.clamp_rows([row])
+            on_channel(i, presetcodec.row_to_conf(i, arr[0]))
+
+    def field(key, value):
+        if on_field is not None:
+            on_field(key, presetcodec.decode_channels(value)[0] if key == "channels" else value)
+
     try:
-        resp = llm.gen_resp(prompt)
+        prompt = build_synth_prompt(params, user_text)
+        if streaming:
+            resp = llm.gen_resp_stream(prompt, field, row_to_channel, abort=abort)
+        else:
+            resp = llm.gen_resp(prompt, abort=abort)
         # ensure it has the keys we expect:
         for k in ("exit", "description", "channels"):
             if k not in resp:
                 raise KeyError(f"Missing '{k}' in LLM response")
-        return resp
+        resp["channels"], clamped = presetcodec.decode_channels(resp["channels"])
+        if clamped:
+            print(f"LLM response: {clamped} values clamped to range")
     except Exception as e:
-        print("LLM call failed:", e)
-        return {"exit": 1, "description": "", "channels": []}
+        print("LLM call failed:", repr(e))
+        return {"exit": 1, "description": "", "channels": [], "error": repr(e)}
+    if cache is not None:
+        cache.put(user_text, params, resp)
+    return resp
+
+# mic block length in seconds; the VAD splits each block into 10 ms frames
+VAD_BLOCK = 0.03
+# longest wait for the decoder thread's final result after the mic stops
+FINISH_TIMEOUT = 5.0
+
+def pick_capture_rate(preferred: int, fallback: int) -> int:
+    """Open the mic at `preferred` if the input device supports it, else at `fallback`."""
+    import sounddevice as sd
+    try:
+        sd.check_input_settings(channels=1, samplerate=preferred, dtype='float32')
+        return preferred
+    except Exception:
+        return fallback
+
+def open_capture(model_rate, samplerate, threshold, silence_duration, pre_roll):
+    """(mic rate, resampler to model_rate or None, VAD) for recording; imports sounddevice."""
+    rate = pick_capture_rate(model_rate, samplerate)
+    resampler = PolyphaseResampler(rate, model_rate) if rate != model_rate else None
+    vad = VoiceActivityDetector(rate, min_threshold=threshold, hangover=silence_duration, pre_roll=pre_roll)
+    return rate, resampler, vad
 
 class SpeechToTextLocal:
     def __init__(self,
@@ -133,106 +367,277 @@ class SpeechToTextLocal:
                  samplerate: int = 44100,
                  threshold: float = 0.02,
                  silence_duration: float = 1.0,
-                 max_record_time: float = 30.0):
+                 max_record_time: float = 30.0,
+                 model_rate: int = 16000,
+                 pre_roll: float = 0.3,
+                 grammar: list = None,
+                 min_confidence: float = 0.6,
+                 parallel_open: bool = False):
         """
         model_path:       path to your Vosk model folder
-        samplerate:       recording sample rate
-        threshold:        RMS level above which we consider 'speech'
+        samplerate:       recording sample rate, used when the mic cannot open at model_rate
+        threshold:        lowest RMS level considered 'speech'; the VAD raises it
+                          above the measured noise floor in louder rooms
         silence_duration: seconds of silence to auto‐stop after speaking
         max_record_time:  absolute cap on recording length
+        model_rate:       rate the recognizer decodes at; captured audio is
+                          resampled to it with a streaming polyphase filter
+        pre_roll:         seconds of audio kept from before speech onset
+        grammar:          optional phrase list (e.g. vocab.recognizer_grammar());
+                          utterances are decoded against it, and the buffered
+                          utterance is re-decoded with the open vocabulary when
+                          any word is [unk] or the mean word confidence is below
+                          min_confidence
+        parallel_open:    with a grammar, also feed every block to the
+                          open-vocabulary recognizer while recording, so the
+                          fallback text is ready at once (twice the decode work)
+
+        The model is not loaded here: call load_async() once the synth is up,
+        or let the first record_and_transcribe() load it. `ready` is set when
+        the recognizer can take audio.
         """
-        print(f"Loading Vosk model from {model_path} …")
-        self.model = Model(model_path)
-        self.samplerate       = samplerate
+        self.model_path       = model_path
+        self.model_rate       = model_rate
         self.threshold        = threshold
         self.silence_duration = silence_duration
         self.max_record_time  = max_record_time
+        # capture rate, resampler and VAD are set up by the first recording,
+        # so building this object never imports sounddevice
+        self.capture = (samplerate, pre_roll)
+        self.samplerate = self.resampler = self.vad = None
+
+        self.grammar = grammar
+        self.min_confidence = min_confidence
+        self.parallel_open = parallel_open
+        self.partial = ""
+        self.open_partial = ""   # open-vocabulary partial (same as partial without a grammar)
+        self.on_partial = None
+        self._segments = []
+        self._open_segments = []
+        self._final = ""
+        self._audio_q = queue.Queue()
+        # the current utterance at model_rate, kept for an open-vocabulary re-decode
+        self._utterance = deque()
+        self._utterance_bytes = 0
+        self._utterance_max = int((max_record_time or 30.0) * model_rate * 2)
+        self.decodes = {"grammar": 0, "open": 0}
+        self.ready = threading.Event()
+        self.load_time = None
+        self._load_lock = threading.Lock()
+
+    def load(self):
+        """Load the model and start the decoder thread; safe to call more than once."""
+        with self._load_lock:
+            if self.ready.is_set():
+                return
+            print(f"Loading Vosk model from {self.model_path} …")
+            t0 = time.perf_counter()
+            from vosk import Model, KaldiRecognizer
+            self.model = Model(self.model_path)
+            # long-lived recognizers, fed block by block from a decoder thread
+            self.recognizer = KaldiRecognizer(self.model, self.model_rate)
+            self.recognizer.SetWords(False)
+            self.grammar_recognizer = None
+            if self.grammar:
+                self.grammar_recognizer = KaldiRecognizer(self.model, self.model_rate, json.dumps(self.grammar))
+                self.grammar_recognizer.SetWords(True)   # per-word confidences
+            threading.Thread(target=self._decode_loop, daemon=True).start()
+            self.load_time = time.perf_counter() - t0
+            print(f"Vosk model ready after {self.load_time:.1f} s")
+            self.ready.set()
+
+    def load_async(self):
+        """Load the model on a background thread."""
+        threading.Thread(target=self.load, daemon=True).start()
+
+    def _decode_loop(self):
+        """
+        Decoder thread. Queue items are int16 PCM bytes, or an Event that marks
+        the end of an utterance: the final text is stored and the recognizers reset.
+        With a grammar, blocks are also kept for a re-decode, or with
+        parallel_open fed to the open-vocabulary recognizer as they come.
+        """
+        rec = self.grammar_recognizer or self.recognizer
+        open_rec = None
+        if self.grammar_recognizer is not None and self.parallel_open:
+            open_rec = self.recognizer
+        while True:
+            item = self._audio_q.get()
+            if isinstance(item, threading.Event):
+                self._segments.append(json.loads(rec.FinalResult()))
+                rec.Reset()
+                if open_rec is not None:
+                    self._open_segments.append(json.loads(open_rec.FinalResult()))
+                    open_rec.Reset()
+                self._final = self._pick_transcript()
+                self._segments = []
+                self._open_segments = []
+                self._utterance.clear()
+                self._utterance_bytes = 0
+                item.set()
+                continue
+            if self.grammar_recognizer is not None and open_rec is None:
+                self._keep(item)
+            self.partial = self._accept(rec, item, self._segments)
+            self.open_partial = self.partial
+            if open_rec is not None:
+                self.open_partial = self._accept(open_rec, item, self._open_segments)
+            if self.on_partial is not None:
+                self.on_partial(self.partial)
+
+    def _keep(self, pcm):
+        """Append to the bounded utterance buffer, dropping the oldest audio when full."""
+        self._utterance.append(pcm)
+        self._utterance_bytes += len(pcm)
+        while self._utterance_bytes > self._utterance_max:
+            self._utterance_bytes -= len(self._utterance.popleft())
+
+    @staticmethod
+    def _accept(rec, pcm, segments):
+        """Feed one block to rec; returns the utterance text so far."""
+        if rec.AcceptWaveform(pcm):
+            # Vosk found an endpoint inside the utterance
+            segments.append(json.loads(rec.Result()))
+            partial = ""
+        else:
+            partial = json.loads(rec.PartialResult()).get("partial", "")
+        return " ".join(t for t in [r.get("text", "") for r in segments] + [partial] if t)
+
+    def _pick_transcript(self):
+        """Final text of the utterance, falling back to the open vocabulary if needed."""
+        text = " ".join(r.get("text", "") for r in self._segments if r.get("text"))
+        if self.grammar_recognizer is None:
+            return text
+        words = [w for r in self._segments for w in r.get("result", [])]
+        confidence = sum(w["conf"] for w in words) / len(words) if words else 0.0
+        if words and "[unk]" not in text and confidence >= self.min_confidence:
+            self.decodes["grammar"] += 1
+            return text
+        if not words:
+            return ""   # nothing was said, no fallback needed
+        # out-of-grammar or unsure: the open-vocabulary text, decoded alongside
+        # or from the buffered utterance now
+        if not self.parallel_open:
+            rec = self.recognizer
+            for pcm in self._utterance:
+                if rec.AcceptWaveform(pcm):
+                    self._open_segments.append(json.loads(rec.Result()))
+            self._open_segments.append(json.loads(rec.FinalResult()))
+            rec.Reset()
+        open_text = " ".join(r.get("text", "") for r in self._open_segments if r.get("text"))
+        self.decodes["open"] += 1
+        print(f"Grammar decode '{text}' (confidence {confidence:.2f}) rejected, using open vocabulary")
+        return open_text
+
+    def _finish_utterance(self):
+        done = threading.Event()
+        self._audio_q.put(done)
+        if not done.wait(FINISH_TIMEOUT):
+            print("⚠️ Decoder did not finish the utterance in time")
+            return ""
+        return self._final
+
+    def _open_capture(self):
+        samplerate, pre_roll = self.capture
+        self.samplerate, self.resampler, self.vad = open_capture(
+            self.model_rate, samplerate, self.threshold, self.silence_duration, pre_roll)
 
-    def record_and_transcribe(self) -> str:
+    def record_and_transcribe(self, abort=None) -> str:
         """
-        1) wait for speech (RMS > threshold)
-        2) record until silence_duration of quiet or max_record_time
-        3) feed PCM to Vosk and return transcript
+        1) wait for speech (see vad.VoiceActivityDetector); the pre-roll
+           before the onset is decoded too, so the first syllable is kept
+        2) stream each block to the decoder thread until silence_duration of
+           quiet or max_record_time; partial results appear in self.partial
+           (and self.on_partial, if set) while the user is speaking
+        3) return the final transcript
+        abort: optional threading.Event; when set, recording stops and "" is returned
         """
+        import sounddevice as sd
+        self.load()
         print("⏳ Waiting for speech…")
-        frames         = []
-        in_speech      = False
-        silence_start  = None
         stop_recording = False
         start_time     = time.time()
+        self.partial   = ""
+        self.open_partial = ""
+        if self.vad is None:
+            self._open_capture()
+        self.vad.reset()
+        if self.resampler is not None:
+            self.resampler.reset()
+
+        def feed(block):
+            if self.resampler is not None:
+                block = self.resampler.process(block)
+            # convert to 16-bit PCM bytes for Vosk
+            self._audio_q.put((np.clip(block, -1.0, 1.0) * 32767).astype(np.int16).tobytes())
 
         def callback(indata, _frames, _time, _status):
-            nonlocal in_speech, silence_start, stop_recording, start_time
-            # compute RMS on float32 audio in [-1,1]
-            rms = np.sqrt(np.mean(indata**2))
-            now = time.time()
-
+            nonlocal stop_recording
             # overall timeout
-            if self.max_record_time and now - start_time > self.max_record_time:
+            if self.max_record_time and time.time() - start_time > self.max_record_time:
                 stop_recording = True
                 raise sd.CallbackStop()
 
-            # speech start
-            if rms > self.threshold:
-                if not in_speech:
-                    in_speech = True
-                    print("🎤 Speech detected, recording…")
-                silence_start = None
-                frames.append(indata.copy())
-
-            # speech has started → watch for silence
-            elif in_speech:
-                if silence_start is None:
-                    silence_start = now
-                elif now - silence_start >= self.silence_duration:
-                    print("🤫 Silence detected, stopping.")
-                    stop_recording = True
-                    raise sd.CallbackStop()
-                frames.append(indata.copy())
+            was_speech = self.vad.in_speech
+            kept = self.vad.process(indata[:, 0])
+            if kept is None:
+                return
+            if not was_speech:
+                print("🎤 Speech detected, recording…")
+            feed(kept)
+            if self.vad.ended:
+                print("🤫 Silence detected, stopping.")
+                stop_recording = True
+                raise sd.CallbackStop()
 
         # open stream and spin until we hit stop_recording
         with sd.InputStream(
             channels=1,
             samplerate=self.samplerate,
+            blocksize=int(self.samplerate * VAD_BLOCK),
             dtype='float32',
             callback=callback
         ):
             while not stop_recording:
+                if abort is not None and abort.is_set():
+                    break
                 time.sleep(0.05)
 
+        # the decoder has kept up with the stream, so this returns almost at once
+        text = self._finish_utterance()
+        if abort is not None and abort.is_set():
+            return ""
         # no speech?
-        if not frames:
+        if not self.vad.in_speech:
             print("⚠️ No speech detected.")
             return ""
-
-        # convert to 16-bit PCM bytes for Vosk
-        audio = np.concatenate(frames, axis=0)
-        pcm_data = (audio * 32767).astype(np.int16).tobytes()
-
-        # feed into Vosk recognizer
-        rec = KaldiRecognizer(self.model, self.samplerate)
-        rec.SetWords(False)
-        rec.AcceptWaveform(pcm_data)
-        result = rec.FinalResult()
-        text = json.loads(result).get("text", "")
         print("📝 Transcription:", text)
         return text
 
 class TextToSpeech:
-    def __init__(self, rate: int = 180, volume: int = 200):
+    def __init__(self, rate: int = 180, volume: int = 200, mixer=None, bank=None):
         """
         rate:    speaking rate (words per minute)
         volume:  amplitude (0–200)
+        mixer:   optional speech.SpeechMixer; with a phrase bank, speech is
+                 rendered once and mixed into the synth output stream
+        bank:    optional speech.PhraseBank caching rendered phrases
         """
         self.rate = rate
         self.volume = volume
+        self.mixer = mixer
+        self.bank = bank
 
     def speak(self, text: str):
         """
-        Synchronously speak the given text using espeak.
-        espeak handles playback itself; no external player needed.
+        Synchronously speak the given text.
+        With a mixer the cached phrase is played through the synth stream;
+        otherwise espeak handles playback itself.
         All espeak output is suppressed to keep the console clean.
         """
+        if self.mixer is not None:
+            self.mixer.play(self.bank.get(text)).wait()
+            return
         subprocess.call(
             [
                 'espeak',
@@ -244,6 +649,31 @@ class TextToSpeech:
             stderr=subprocess.DEVNULL
         )
 
+    async def speak_async(self, text: str):
+        """
+        Speak without blocking the event loop; cancelling the awaiting task
+        stops the speech immediately.
+        """
+        if self.mixer is not None:
+            samples = await asyncio.to_thread(self.bank.get, text)
+            clip = self.mixer.play(samples)
+            try:
+                await asyncio.to_thread(clip.wait)
+            except asyncio.CancelledError:
+                clip.cancel()
+                raise
+            return
+        proc = await asyncio.create_subprocess_exec(
+            'espeak', f'-s{self.rate}', f'-a{self.volume}', text,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            await proc.wait()
+        except asyncio.CancelledError:
+            proc.kill()
+            raise
+
 class SpeechToTextWhisper:
     def __init__(
         self,
@@ -252,90 +682,115 @@ class SpeechToTextWhisper:
         samplerate: int = 44100,
         threshold: float = 0.02,
         silence_duration: float = 1.0,
-        max_record_time: float = None
+        max_record_time: float = None,
+        model_rate: int = 16000,
+        pre_roll: float = 0.3,
+        base_url: str = None
     ):
         """
-        threshold: RMS level (0–1) to detect start of speech.
+        threshold:  lowest RMS level (0–1) considered speech; raised above the noise floor by the VAD
+        pre_roll:   seconds of audio kept from before speech onset
+        samplerate: recording sample rate, used when the mic cannot open at model_rate
+        model_rate: rate of the uploaded audio; speech models need no more than 16 kHz
+        base_url:   optional OpenAI-compatible endpoint (e.g. a local stand-in server)
         """
         # load API key
         with open(api_key_path, 'r') as f:
-            openai.api_key = f.read().strip()
-        if not openai.api_key:
+            api_key = f.read().strip()
+        if not api_key:
             raise ValueError("OpenAI API key not found.")
+        # one client for the whole session, so its pooled connection is reused between utterances
+        import openai
+        self.client = openai.OpenAI(api_key=api_key, base_url=base_url)
 
         self.model            = model
-        self.samplerate       = samplerate
+        self.model_rate       = model_rate
         self.threshold        = threshold
         self.silence_duration = silence_duration
         self.max_record_time  = max_record_time
+        # capture rate, resampler and VAD are set up by the first recording,
+        # so building this object never imports sounddevice
+        self.capture = (samplerate, pre_roll)
+        self.samplerate = self.resampler = self.vad = None
+
+    def _open_capture(self):
+        samplerate, pre_roll = self.capture
+        self.samplerate, self.resampler, self.vad = open_capture(
+            self.model_rate, samplerate, self.threshold, self.silence_duration, pre_roll)
 
-    def record_and_transcribe(self) -> str:
+    def record_and_transcribe(self, abort=None) -> str:
+        """
+        Record one utterance and transcribe it via the Whisper API.
+        abort: optional threading.Event; when set, recording stops and "" is returned
+        """
+        import sounddevice as sd
         print("⏳ Waiting for speech…")
         frames        = []
-        in_speech     = False
-        silence_start = None
         stop_recording= False
         start_time    = time.time()
+        if self.vad is None:
+            self._open_capture()
+        self.vad.reset()
+        if self.resampler is not None:
+            self.resampler.reset()
+
+        def keep(block):
+            if self.resampler is not None:
+                block = self.resampler.process(block)
+            # encode as we go: 16-bit PCM at model_rate
+            frames.append((np.clip(block, -1.0, 1.0) * 32767).astype(np.int16).tobytes())
 
         def callback(indata, _frames, _time, _status):
-            nonlocal in_speech, silence_start, stop_recording, start_time
-            rms = np.sqrt(np.mean(indata**2))
-            now = time.time()
-
+            nonlocal stop_recording
             # overall timeout guard
-            if self.max_record_time and now - start_time > self.max_record_time:
+            if self.max_record_time and time.time() - start_time > self.max_record_time:
                 stop_recording = True
                 raise sd.CallbackStop()
 
-            if rms > self.threshold:
-                if not in_speech:
-                    in_speech = True
-                    print("🎤 Speech detected, recording…")
-                silence_start = None
-                frames.append(indata.copy())
-
-            else:
-                if in_speech:
-                    # start silence timer
-                    if silence_start is None:
-                        silence_start = now
-                    elif now - silence_start >= self.silence_duration:
-                        print("🤫 Silence detected, stopping.")
-                        stop_recording = True
-                        raise sd.CallbackStop()
-                    frames.append(indata.copy())
+            was_speech = self.vad.in_speech
+            kept = self.vad.process(indata[:, 0])
+            if kept is None:
+                return
+            if not was_speech:
+                print("🎤 Speech detected, recording…")
+            keep(kept)
+            if self.vad.ended:
+                print("🤫 Silence detected, stopping.")
+                stop_recording = True
+                raise sd.CallbackStop()
 
         # open stream, then spin until callback sets stop_recording
         with sd.InputStream(
             channels=1,
             samplerate=self.samplerate,
+            blocksize=int(self.samplerate * VAD_BLOCK),
             dtype='float32',
             callback=callback
         ):
             while not stop_recording:
+                if abort is not None and abort.is_set():
+                    return ""
                 time.sleep(0.05)
 
         if not frames:
             print("⚠️ No speech detected.")
             return ""
 
-        # concatenate and write WAV
-        audio = np.concatenate(frames, axis=0)
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-            wav.write(tmp.name, self.samplerate, audio)
-            tmp_path = tmp.name
-
-        try:
-            print("⏳ Transcribing via Whisper…")
-            with open(tmp_path, "rb") as f:
-                resp = openai.Audio.transcriptions.create(
-                    model=self.model,
-                    file=f
-                )
-            text = resp.get("text", "").strip()
-            print("📝 Transcription:", text)
-            return text
-
-        finally:
-            try: os.remove(tmp_path)
-            except: pass
\ No newline at end of file
+        return self.transcribe(b"".join(frames))
+
+    def transcribe(self, pcm: bytes) -> str:
+        """Upload mono int16 PCM at model_rate as an in-memory WAV and return the text."""
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.model_rate)
+            w.writeframes(pcm)
+        print(f"⏳ Transcribing via Whisper ({buf.tell() / 1000:.0f} kB)…")
+        resp = self.client.audio.transcriptions.create(
+            model=self.model,
+            file=("speech.wav", buf.getvalue(), "audio/wav")
+        )
+        text = resp.text.strip()
+        print("📝 Transcription:", text)
+        return text
@@ -0,0 +1,52 @@
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+class PolyphaseResampler:
+    """
+    Streaming rational resampler (sr_in -> sr_out) for mono float32 blocks.
+    A windowed-sinc lowpass is split into `up` polyphase branches, and each
+    output sample is one dot product of a branch with the input history, so
+    the work scales with the output rate. The filter history is carried
+    between blocks: feeding consecutive blocks gives the same result as
+    resampling their concatenation.
+    """
+    def __init__(self, sr_in=44100, sr_out=16000, taps_per_phase=16, cutoff=0.9):
+        g = gcd(sr_in, sr_out)
+        self.up = sr_out // g
+        self.down = sr_in // g
+        self.sr_in = sr_in
+        self.sr_out = sr_out
+        self.taps = taps_per_phase
+
+        # prototype lowpass at the upsampled rate, passband edge cutoff * min(sr_in, sr_out) / 2
+        n = taps_per_phase * self.up
+        fc = cutoff * 0.5 / max(self.up, self.down)
+        k = np.arange(n) - (n - 1) / 2
+        h = 2 * fc * np.sinc(2 * fc * k) * np.kaiser(n, 8.0) * self.up
+        # bank[p] holds taps h[p], h[p+up], ... reversed to line up with the input window
+        self.bank = h.reshape(taps_per_phase, self.up).T[:, ::-1].astype(np.float32).copy()
+        self.reset()
+
+    def reset(self):
+        """Forget the history, e.g. at the start of a new utterance."""
+        self.hist = np.zeros(self.taps - 1, dtype=np.float32)
+        # upsampled-domain position of the next output, relative to the next block
+        self.next_u = 0
+
+    def process(self, block):
+        """Resample one block; returns the output samples it completes."""
+        block = np.asarray(block, dtype=np.float32).reshape(-1)
+        n = len(block)
+        buf = np.concatenate((self.hist, block))
+        # outputs whose newest input sample falls inside this block
+        count = max(0, -(-(n * self.up - self.next_u) // self.down))
+        us = self.next_u + self.down * np.arange(count)
+        idx = us // self.up
+        phases = us % self.up
+        windows = sliding_window_view(buf, self.taps)
+        out = np.einsum('ij,ij->i', windows[idx], self.bank[phases])
+        self.next_u += count * self.down - n * self.up
+        self.hist = buf[len(buf) - (self.taps - 1):]
+        return out.astype(np.float32)
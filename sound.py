@@ -1,58 +1,114 @@
+import time
+from collections import deque
+
 from channel import *
+from params import ParamBank
+
+XFADE = 0.03   # seconds of equal-power crossfade when apply_preset() swaps channels
 
 class Sound:
     def __init__(self, sr=44100):
         self.sr = sr
         self.channels = []
         self.volumes = []
+        self.params = ParamBank(self)
+        self._pending = deque()   # prepared {index: channel} swaps, taken by process()
+        self._fade = None         # ({index: outgoing channel}, samples faded so far)
+        self.xfade = max(1, int(XFADE * sr))
+        self.automation = None    # automation.Automation, played back in process()
+        self.modulation = None    # modulation.ModMatrix, applied on top in process()
+        self.samples = 0          # samples rendered so far
+        self._clock = (time.monotonic(), 0)
 
     def add_channel(self, channel):
         """Add a channel to the sound."""
         self.channels.append(channel)
 
+    def apply_preset(self, confs):
+        """
+        Apply channel configs (to_dict() format) as one atomic change: a list
+        in channel order, or {index: conf}. The new channels are fully built
+        here, on the caller's thread; process() swaps them in at the next block
+        boundary with a short equal-power crossfade from the old ones.
+        """
+        items = confs.items() if isinstance(confs, dict) else enumerate(confs)
+        prepared = {i: self.params.prepare(i, conf) for i, conf in items if conf}
+        if prepared:
+            self._pending.append(prepared)
+
+    def _start_fade(self):
+        """Swap in the pending channels; the outgoing ones are kept for the crossfade."""
+        swap = {}
+        while self._pending:
+            swap.update(self._pending.popleft())
+        chans = list(self.channels)
+        outgoing = {}
+        for i, channel in swap.items():
+            # notes and blocks since prepare() only reached the old channel
+            channel.follow(chans[i])
+            if chans[i].envelopes[0].state != 'idle':
+                outgoing[i] = chans[i]
+            chans[i] = channel
+        # a new list, so ParamBank rebinds to the new channels
+        self.channels = chans
+        self.params.mark_all()
+        self._fade = (outgoing, 0) if outgoing else None
+
+    def clock(self, t=None):
+        """
+        Seconds on the sample clock at monotonic time t (default: now),
+        extrapolated from the start of the last rendered block.
+        """
+        t0, samples = self._clock
+        return samples / self.sr + ((time.monotonic() if t is None else t) - t0)
+
     def process(self, frames):
         """Process all channels and mix them down to a single output."""
+        self._clock = (time.monotonic(), self.samples)
+        self.samples += frames
+        if self._fade is None and self._pending:
+            self._start_fade()
+        curves = {}
+        if self.automation is not None and self.automation.playing:
+            curves = self.automation.render(self, frames)
+        if self.modulation is not None and self.modulation.active:
+            curves = self.modulation.render(self, frames, curves)
         sig = np.zeros(frames)
-        for channel in self.channels:
-            sig += channel.process(frames)
+        if self._fade is None:
+            for i, channel in enumerate(self.channels):
+                sig += channel.process(frames, **curves.get(i, {}))
+            return sig
+
+        outgoing, done = self._fade
+        t = np.minimum((done + np.arange(frames)) / self.xfade, 1.0) * (np.pi / 2)
+        fade_in, fade_out = np.sin(t), np.cos(t)
+        for i, channel in enumerate(self.channels):
+            if i in outgoing:
+                sig += fade_in * channel.process(frames, **curves.get(i, {})) \
+                    + fade_out * outgoing[i].process(frames)
+            else:
+                sig += channel.process(frames, **curves.get(i, {}))
+        done += frames
+        self._fade = (outgoing, done) if done < self.xfade else None
         return sig
 
+    def _all_channels(self):
+        """The current channels plus any still fading out."""
+        fade = self._fade
+        if fade is None:
+            return self.channels
+        return self.channels + list(fade[0].values())
+
     def note_on(self):
         """Trigger note on for all channels."""
-        for channel in self.channels:
+        for channel in self._all_channels():
             channel.envelopes[0].note_on()
     
     def note_off(self):
         """Trigger note off for all channels."""
-        for channel in self.channels:
+        for channel in self._all_channels():
             channel.envelopes[0].note_off()
 
     def get_current_params(self):
-        """Get a string representation of the current parameters."""
-        params = []
-        for channel in self.channels:
-            param = {}
-            param['waveform'] = {}
-            param['waveform']['name'] = channel.waveform.name
-            param['waveform']['frequency'] = channel.waveform.frequency
-
-            param['envelope'] = {}
-            param['envelope']['attack_time'] = channel.envelopes[0].attack_time
-            param['envelope']['decay_time'] = channel.envelopes[0].decay_time
-            param['envelope']['sustain_level'] = channel.envelopes[0].sustain_level
-            param['envelope']['release_time'] = channel.envelopes[0].release_time
-
-            param['filter'] = {}
-            param['filter']['low'] = channel.filters[0].low
-            param['filter']['mid'] = channel.filters[0].mid
-            param['filter']['high'] = channel.filters[0].high
-
-            param['reverb'] = {}
-            param['reverb']['decay'] = channel.reverbs[0].decay
-            param['reverb']['delay'] = channel.reverbs[0].delay
-            param['reverb']['wet'] = channel.reverbs[0].wet
-
-            param['volume'] = channel.volume
-
-            params.append(param)
-        return params
\ No newline at end of file
+        """Get the current parameters of every channel in the preset format."""
+        return [self.params.to_dict(ch) for ch in range(len(self.channels))]
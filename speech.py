@@ -0,0 +1,179 @@
+import hashlib
+import io
+import os
+import subprocess
+import threading
+import wave
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from resample import PolyphaseResampler
+
+class SpeechClip:
+    """One queued utterance; wait() blocks until it has played or was cancelled."""
+    def __init__(self, samples):
+        self.samples = samples
+        self.pos = 0
+        self.cancelled = False
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+    def cancel(self):
+        self.cancelled = True
+        self.done.set()
+
+class SpeechMixer:
+    """
+    Plays speech through the synth's own output stream.
+    play() queues a clip from any thread; mix() runs inside the audio callback,
+    adds the queued speech to the block and ducks the synth under it, ramping
+    the synth gain over `fade` seconds so ducking does not click.
+    """
+    def __init__(self, samplerate, duck=0.3, fade=0.05):
+        self.duck = duck
+        self.fade_len = max(1, int(fade * samplerate))
+        self.gain = 1.0
+        self.clips = deque()
+        self.current = None
+
+    def play(self, samples):
+        clip = SpeechClip(np.asarray(samples, dtype=np.float32))
+        self.clips.append(clip)
+        return clip
+
+    def stop(self):
+        """Cancel everything queued or playing."""
+        while self.clips:
+            self.clips.popleft().cancel()
+        if self.current is not None:
+            self.current.cancel()
+
+    @property
+    def active(self):
+        return self.current is not None or bool(self.clips)
+
+    def mix(self, out):
+        """Mix speech into one mono float32 output block, in place."""
+        n = len(out)
+        target = self.duck if self.active else 1.0
+        step = n / self.fade_len * (1.0 - self.duck)
+        g1 = min(target, self.gain + step) if target > self.gain else max(target, self.gain - step)
+        if g1 != 1.0 or self.gain != 1.0:
+            out *= np.linspace(self.gain, g1, n, dtype=np.float32)
+        self.gain = g1
+
+        pos = 0
+        while pos < n:
+            clip = self.current
+            if clip is None or clip.cancelled:
+                if not self.clips:
+                    self.current = None
+                    break
+                self.current = clip = self.clips.popleft()
+                continue
+            take = min(n - pos, len(clip.samples) - clip.pos)
+            out[pos:pos + take] += clip.samples[clip.pos:clip.pos + take]
+            clip.pos += take
+            pos += take
+            if clip.pos >= len(clip.samples):
+                self.current = None
+                clip.done.set()
+        np.clip(out, -1.0, 1.0, out=out)
+
+class PhraseBank:
+    """
+    espeak renders each phrase to PCM once (`espeak --stdout`, no audio device),
+    resampled to the output rate. Rendered phrases are kept in a bounded
+    in-memory LRU and as int16 .npy files on disk, so repeated prompts, across
+    runs too, start without spawning espeak.
+    """
+    def __init__(self, samplerate, rate=180, volume=200, cache_dir=".tts_cache",
+                 max_items=32, max_files=200):
+        self.samplerate = samplerate
+        self.rate = rate
+        self.volume = volume
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self.max_files = max_files
+        self.memory = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, text):
+        raw = f"{self.rate}|{self.volume}|{self.samplerate}|{text}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def render(self, text):
+        """Synthesize text with espeak; returns float32 samples at samplerate."""
+        wav_bytes = subprocess.run(
+            ['espeak', '--stdout', f'-s{self.rate}', f'-a{self.volume}', text],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+        ).stdout
+        with wave.open(io.BytesIO(wav_bytes)) as w:
+            sr = w.getframerate()
+            # espeak leaves the length fields unset when writing to a pipe
+            pcm = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+        samples = pcm.astype(np.float32) / 32768
+        if sr != self.samplerate:
+            rs = PolyphaseResampler(sr, self.samplerate)
+            samples = np.concatenate((rs.process(samples), rs.process(np.zeros(rs.taps, np.float32))))
+        return samples
+
+    def get(self, text):
+        key = self._key(text)
+        with self._lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return self.memory[key]
+        samples = self._load(key)
+        if samples is None:
+            samples = self.render(text)
+            self._store(key, samples)
+        with self._lock:
+            self.memory[key] = samples
+            while len(self.memory) > self.max_items:
+                self.memory.popitem(last=False)
+        return samples
+
+    def warm(self, phrases):
+        """Render phrases in the background so the first use is instant."""
+        def run():
+            for text in phrases:
+                try:
+                    self.get(text)
+                except (OSError, subprocess.CalledProcessError) as e:
+                    print("TTS warm-up failed:", e)
+        threading.Thread(target=run, daemon=True).start()
+
+    def _file(self, key):
+        return os.path.join(self.cache_dir, key + ".npy")
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            pcm = np.load(self._file(key))
+        except (OSError, ValueError):
+            return None
+        os.utime(self._file(key))
+        return pcm.astype(np.float32) / 32767
+
+    def _store(self, key, samples):
+        if not self.cache_dir:
+            return
+        tmp = self._file(key) + ".tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16))
+        os.replace(tmp, self._file(key))
+        files = [os.path.join(self.cache_dir, n) for n in os.listdir(self.cache_dir) if n.endswith(".npy")]
+        if len(files) > self.max_files:
+            files.sort(key=os.path.getmtime)
+            for path in files[:len(files) - self.max_files]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# An exit reply ("I'm done") has an empty channel list; call_synth_llm must
+# return it with its description and no "error" key, on both the blocking and
+# the streamed path, using the local stub server instead of the OpenAI API.
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+import reaction
+from stub_llm_server import StubLLMServer
+
+reply = {"exit": 1, "description": "Okay, see you", "channels": []}
+stub = StubLLMServer(response=reply, latency=0.0).start()
+with tempfile.NamedTemporaryFile("w", suffix=".key", delete=False) as f:
+    f.write("stub-key")
+llm = reaction.LLMClient(api_key_path=f.name, base_url=stub.url)
+
+ok = True
+for name, kwargs in (("blocking", {}), ("streamed", {"on_field": lambda k, v: None})):
+    resp = reaction.call_synth_llm(llm, "I'm done", [], **kwargs)
+    good = "error" not in resp and resp["exit"] == 1 and resp["description"] == reply["description"]
+    ok &= good
+    print(f"{name}: {resp} ({'ok' if good else 'FAIL'})")
+print("PASS" if ok else "FAIL")
+
+stub.stop()
+os.remove(f.name)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# Latency budget, hedging and abort of LLMClient against the local stub server.
+#
+# Each scenario scripts the stub's per-request latencies and failures, then
+# makes one streamed and one blocking call and reports how long it took, how
+# many requests reached the server and what the client did.
+import os
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", ".."))
+import reaction
+from stub_llm_server import StubLLMServer
+
+BUDGET = 3.0
+HEDGE_AFTER = 0.8
+
+# name, stub delays per request (in arrival order), failing requests, abort after (s)
+SCENARIOS = [
+    ("fast", [], [], None),
+    ("first request stalls", [30.0], [], None),
+    ("first request fails", [], [0], None),
+    ("everything stalls", [30.0, 30.0], [], None),
+    ("abort while waiting", [30.0, 30.0], [], 0.5),
+]
+
+def call(llm, stream, abort):
+    t0 = time.perf_counter()
+    try:
+        if stream:
+            llm.gen_resp_stream("make it warmer", abort=abort)
+        else:
+            llm.gen_resp("make it warmer", abort=abort)
+        outcome = "ok"
+    except Exception as e:
+        outcome = type(e).__name__
+    return outcome, time.perf_counter() - t0
+
+if __name__ == "__main__":
+    with tempfile.NamedTemporaryFile("w", suffix=".key", delete=False) as f:
+        f.write("stub-key")
+    for name, delays, failures, abort_after in SCENARIOS:
+        print(f"--- {name}")
+        for stream in (True, False):
+            stub = StubLLMServer(latency=0.3, delays=delays, failures=failures).start()
+            llm = reaction.LLMClient(api_key_path=f.name, base_url=stub.url,
+                                     timeout=BUDGET, hedge_after=HEDGE_AFTER)
+            abort = threading.Event()
+            if abort_after is not None:
+                threading.Timer(abort_after, abort.set).start()
+            outcome, elapsed = call(llm, stream, abort)
+            kind = "stream  " if stream else "blocking"
+            print(f"==> {kind} {outcome:14s} {elapsed:5.2f} s, {stub.requests} requests, {llm.stats}")
+            stub.stop()
+    os.remove(f.name)
+    # stalled attempts are still waiting on the stub's sleep; do not join them
+    os._exit(0)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# Size of the synth LLM request/response in the old nested-dict encoding vs
+# the compact presetcodec table. Token counts use tiktoken when installed,
+# otherwise the usual ~4 characters per token estimate.
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+import presetcodec
+import reaction
+
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "last_preset.json")) as f:
+    preset = json.load(f)
+params = preset["channels"]
+
+try:
+    import tiktoken
+    enc = tiktoken.get_encoding("o200k_base")
+    def tokens(text):
+        return len(enc.encode(text))
+except ImportError:
+    def tokens(text):
+        return round(len(text) / 4)
+
+old_prompt = f"Current parameters are:\n{str(params)}\nUser request is: make it warmer"
+new_prompt = reaction.build_synth_prompt(params, "make it warmer")
+old_reply = json.dumps(preset, indent=2)
+new_reply = json.dumps({"exit": 0, "description": preset["description"],
+                        "channels": presetcodec.to_rows(params)})
+
+for name, old, new in (("user prompt", old_prompt, new_prompt), ("reply", old_reply, new_reply)):
+    print(f"{name:12} {tokens(old):5d} -> {tokens(new):4d} tokens ({len(old)} -> {len(new)} chars)")
+print(f"system prompt {tokens(reaction.SYSTEM_PROMPT):4d} tokens")
+
+# clamping: out-of-range and non-finite values are fixed in one pass
+rows = presetcodec.to_rows(params)
+rows[0][1] = 3.0
+rows[1][11] = -0.5
+rows[2][0] = float("nan")
+channels, clamped = presetcodec.decode_channels(rows)
+print(f"clamped {clamped} values:", channels[0]["volume"], channels[1]["reverb"]["wet"],
+      channels[2]["waveform"]["frequency"])
+
+# an exit reply has no channels and must decode, not fail
+print("exit reply decodes to", presetcodec.decode_channels([]),
+      "(ok)" if presetcodec.decode_channels([]) == ([], 0) else "(FAIL)")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# Speculative LLM requests from partial transcripts, against the local stub server.
+#
+# A scripted recognizer plays back partial results the way Vosk reports them
+# while the user speaks, then returns the final transcript after the silence
+# timeout. Each scenario runs one AI turn, with and without speculation, and
+# prints how long the pipeline still waited for the LLM after listening ended.
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", ".."))
+import ai_pipeline
+import reaction
+from presets import default_sound
+from stub_llm_server import StubLLMServer
+
+SILENCE = 1.0   # silence timeout after the last word, as in main.py
+
+class ScriptedSTT:
+    """Replays (seconds, partial text) steps, then returns `final` after SILENCE."""
+    def __init__(self, turns):
+        self.turns = list(turns)
+        self.partial = ""
+
+    def record_and_transcribe(self, abort=None):
+        if not self.turns:
+            return "exit"
+        steps, final = self.turns.pop(0)
+        self.partial = ""
+        t0 = time.perf_counter()
+        for at, text in steps:
+            time.sleep(max(0.0, at - (time.perf_counter() - t0)))
+            self.partial = text
+        time.sleep(SILENCE)
+        return final
+
+class SilentTTS:
+    async def speak_async(self, text):
+        await asyncio.sleep(0)
+
+SPEAKING = [(0.3, "make"), (0.6, "make it"), (0.9, "make it sound"),
+            (1.2, "make it sound like a"), (1.5, "make it sound like a church organ")]
+SCENARIOS = [
+    ("final matches the partial", SPEAKING, "make it sound like a church organ"),
+    ("user kept talking", SPEAKING[:3] + [(2.0, "make it sound like")],
+     "make it sound like a church organ with a long tail"),
+    # grammar recognizer partials: nothing is worth sending
+    ("out-of-grammar partial", [(0.3, "make"), (0.6, "make [unk]"), (0.9, "make [unk] sound [unk] [unk]")],
+     "make it sound like a church organ"),
+]
+
+def run(llm, turns, speculate):
+    pipeline = ai_pipeline.AIPipeline(default_sound(), llm, ScriptedSTT(turns), SilentTTS(),
+                                      threading.Event(), speculate=speculate)
+    pipeline.run()
+    return pipeline
+
+if __name__ == "__main__":
+    stub = StubLLMServer(latency=1.0).start()
+    with tempfile.NamedTemporaryFile("w", suffix=".key", delete=False) as f:
+        f.write("stub-key")
+    llm = reaction.LLMClient(api_key_path=f.name, base_url=stub.url)
+
+    for name, steps, final in SCENARIOS:
+        print(f"--- {name}")
+        for speculate in (False, True):
+            before = stub.requests
+            p = run(llm, [(steps, final)], speculate)
+            time.sleep(0.2)   # cancelled requests return their permits
+            print(f"==> speculate={speculate}: waited {p.timings[0]['llm']:.2f} s for the LLM "
+                  f"after listening, {stub.requests - before} requests, {p.speculation}, "
+                  f"{p._inflight._value}/{p._inflight._initial_value} permits free")
+
+    stub.stop()
+    os.remove(f.name)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# Compare time-to-first-field of the streamed LLM path against the blocking one,
+# using the local stub server instead of the OpenAI API.
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+import reaction
+from stub_llm_server import StubLLMServer
+
+stub = StubLLMServer().start()
+with tempfile.NamedTemporaryFile("w", suffix=".key", delete=False) as f:
+    f.write("stub-key")
+llm = reaction.LLMClient(api_key_path=f.name, base_url=stub.url)
+
+t0 = time.time()
+resp = llm.gen_resp("make it warmer")
+print(f"blocking: full response after {time.time() - t0:.2f} s")
+
+t0 = time.time()
+def on_field(key, value):
+    print(f"  {time.time() - t0:5.2f} s  field {key}")
+def on_channel(i, conf):
+    # raw compact row, in presetcodec.COLUMNS order
+    print(f"  {time.time() - t0:5.2f} s  channel {i} {conf}")
+print("streaming:")
+streamed = llm.gen_resp_stream("make it warmer", on_field, on_channel)
+print("results match:", streamed == resp)
+
+stub.stop()
+os.remove(f.name)
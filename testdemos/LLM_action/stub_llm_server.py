@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# Local stand-in for the OpenAI chat completions and audio transcription endpoints.
+# Serves a canned synth preset, either in one piece or as SSE chunks, and a
+# canned transcript, so the streaming/caching/upload code paths can be
+# exercised without network or API key. Slow and failing responses can be
+# scripted per request to exercise timeouts and hedging.
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", ".."))
+import presetcodec
+
+DEFAULT_PRESET = os.path.join(HERE, "..", "..", "last_preset.json")
+
+def canned_response(path=DEFAULT_PRESET):
+    with open(path) as f:
+        resp = json.load(f)
+    # fields in schema order, channels as compact rows like the real model returns
+    return {"exit": 0, "description": resp["description"],
+            "channels": presetcodec.to_rows(resp["channels"])}
+
+class StubLLMServer:
+    """
+    response:    dict returned as the assistant message content
+    chunk_size:  characters per streamed delta
+    chunk_delay: seconds between streamed deltas (simulated token rate)
+    latency:     seconds before the first byte
+    transcript:  text returned by /audio/transcriptions
+    delays:      optional per-request latencies for chat requests, in arrival
+                 order (latency is used once they run out)
+    failures:    arrival indexes of chat requests answered with HTTP 500
+    """
+    def __init__(self, response=None, chunk_size=8, chunk_delay=0.02, latency=0.3, port=0,
+                 transcript="make it warmer", delays=(), failures=()):
+        self.response = response or canned_response()
+        self.transcript = transcript
+        self.uploads = []    # (bytes received, client port) per transcription request
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.latency = latency
+        self.delays = list(delays)
+        self.failures = set(failures)
+        self.requests = 0
+        self._count_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/v1"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive, so clients can reuse their pooled connection
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.path.endswith("/audio/transcriptions"):
+                    stub.uploads.append((len(raw), self.client_address[1]))
+                    time.sleep(stub.latency)
+                    self._json({"text": stub.transcript})
+                    return
+                body = json.loads(raw)
+                with stub._count_lock:
+                    n = stub.requests
+                    stub.requests += 1
+                time.sleep(stub.delays[n] if n < len(stub.delays) else stub.latency)
+                if n in stub.failures:
+                    self._json({"error": {"message": "stub failure", "type": "server_error"}}, 500)
+                    return
+                content = json.dumps(stub.response)
+                if body.get("stream"):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    # no Content-Length: the stream ends when the connection closes
+                    self.send_header("Connection", "close")
+                    self.close_connection = True
+                    self.end_headers()
+                    for i in range(0, len(content), stub.chunk_size):
+                        self._sse(stub._chunk(body, {"content": content[i:i + stub.chunk_size]}))
+                        time.sleep(stub.chunk_delay)
+                    self._sse(stub._chunk(body, {}, "stop"))
+                    self.wfile.write(b"data: [DONE]\n\n")
+                else:
+                    time.sleep(stub.chunk_delay * len(content) / stub.chunk_size)
+                    self._json({
+                        "id": "stub", "object": "chat.completion", "created": int(time.time()),
+                        "model": body.get("model", "stub"),
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": content}}],
+                    })
+
+            def _json(self, obj, status=200):
+                data = json.dumps(obj).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _sse(self, obj):
+                self.wfile.write(b"data: " + json.dumps(obj).encode() + b"\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+    def _chunk(self, body, delta, finish_reason=None):
+        return {"id": "stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+
+if __name__ == "__main__":
+    stub = StubLLMServer(port=8765).start()
+    print("Stub LLM listening on", stub.url)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# Upload synthetic utterances through SpeechToTextWhisper.transcribe() to the
+# local stub server: checks the in-memory WAV payload size and that the same
+# pooled connection is reused between requests.
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+import reaction
+from stub_llm_server import StubLLMServer
+
+stub = StubLLMServer(latency=0.05).start()
+with tempfile.NamedTemporaryFile("w", suffix=".key", delete=False) as f:
+    f.write("stub-key")
+stt = reaction.SpeechToTextWhisper(api_key_path=f.name, base_url=stub.url)
+
+seconds = 3.0
+t = np.arange(int(stt.model_rate * seconds)) / stt.model_rate
+audio = 0.1 * np.sin(2 * np.pi * 220 * t)
+pcm = (audio * 32767).astype(np.int16).tobytes()
+print(f"{seconds:.0f} s utterance: {len(pcm) / 1000:.0f} kB int16 @ {stt.model_rate} Hz "
+      f"(float32 @ 44100 Hz would be {seconds * 44100 * 4 / 1000:.0f} kB)")
+
+for i in range(3):
+    t0 = time.time()
+    text = stt.transcribe(pcm)
+    print(f"request {i}: {time.time() - t0:.3f} s -> '{text}'")
+
+ports = {port for _, port in stub.uploads}
+print("uploaded bytes:", [n for n, _ in stub.uploads])
+print("connections used:", len(ports))
+
+stub.stop()
+os.remove(f.name)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# Recognizer CPU before/after resampling mic audio to 16 kHz.
+#
+#   python bench_resample.py [speech.wav] [vosk_model_dir]
+#
+# Without a WAV a 10 s synthetic 44.1 kHz test signal is used; without a
+# model only the resampler itself is timed.
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from resample import PolyphaseResampler
+
+BLOCK = 1024
+DEFAULT_MODEL = "/home/pi/vosk_models/vosk-model-en-us-0.22-lgraph"
+
+def load_wav(path):
+    with wave.open(path, "rb") as w:
+        sr = w.getframerate()
+        data = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+        if w.getnchannels() > 1:
+            data = data.reshape(-1, w.getnchannels())[:, 0]
+    return sr, data.astype(np.float32) / 32768
+
+def synthetic(sr=44100, seconds=10.0):
+    # vowel-like harmonics with a syllable-rate envelope and a little noise
+    t = np.arange(int(sr * seconds)) / sr
+    f0 = 120 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    sig = sum(np.sin(k * phase) / k for k in range(1, 20))
+    env = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+    return sr, (0.1 * sig * env + 0.005 * np.random.randn(len(t))).astype(np.float32)
+
+def to_pcm(x):
+    return (np.clip(x, -1, 1) * 32767).astype(np.int16).tobytes()
+
+def decode_cpu(model, sr, audio):
+    from vosk import KaldiRecognizer
+    rec = KaldiRecognizer(model, sr)
+    t0 = time.process_time()
+    for i in range(0, len(audio), BLOCK):
+        rec.AcceptWaveform(to_pcm(audio[i:i + BLOCK]))
+    text = rec.FinalResult()
+    return time.process_time() - t0, text
+
+if __name__ == "__main__":
+    sr, audio = load_wav(sys.argv[1]) if len(sys.argv) > 1 else synthetic()
+    seconds = len(audio) / sr
+    print(f"input: {seconds:.1f} s at {sr} Hz")
+
+    rs = PolyphaseResampler(sr, 16000)
+    t0 = time.process_time()
+    down = np.concatenate([rs.process(audio[i:i + BLOCK]) for i in range(0, len(audio), BLOCK)])
+    t_rs = time.process_time() - t0
+    print(f"resampler: {t_rs * 1000:.1f} ms CPU ({t_rs / seconds * 100:.2f}% of real time)")
+    print(f"payload:   {len(audio) * 4 / 1e6:.2f} MB float32 @ {sr} -> {len(down) * 2 / 1e6:.2f} MB int16 @ 16000")
+
+    model_dir = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_MODEL
+    if not os.path.isdir(model_dir):
+        print("no Vosk model found, skipping recognizer benchmark")
+        sys.exit(0)
+    from vosk import Model
+    model = Model(model_dir)
+    t_before, text_before = decode_cpu(model, sr, audio)
+    t_after, text_after = decode_cpu(model, 16000, down)
+    print(f"recognizer @ {sr}: {t_before:.2f} s CPU  {text_before.strip()}")
+    print(f"recognizer @ 16000: {t_after:.2f} s CPU (+{t_rs:.2f} s resampling)  {text_after.strip()}")
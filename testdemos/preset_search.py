@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# Seed a preset library and time "sounds like this" queries.
+#
+#   python preset_search.py [db_path] [synthetic_count]
+#
+# Imports the JSON presets in LLM_action/generated_sounds (plus last_preset.json
+# if present), lists the nearest neighbours of each, then pads the in-memory
+# index with random feature vectors to time a search at library scale. The
+# padding is never written to the database. add_async() must store queued
+# presets from its one worker thread without printing envelope state.
+import contextlib
+import glob
+import io
+import os
+import threading
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+import presets
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "/tmp/preset_search.db"
+    synthetic = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    library = presets.PresetLibrary(db_path)
+
+    paths = sorted(glob.glob(os.path.join(ROOT, "testdemos", "LLM_action", "generated_sounds", "*.json")))
+    last = os.path.join(ROOT, "last_preset.json")
+    if os.path.exists(last):
+        paths.append(last)
+    t0 = time.perf_counter()
+    ids = library.import_json(paths)
+    print(f"imported {len(ids)} presets, {(time.perf_counter() - t0) / max(len(ids), 1) * 1000:.1f} ms each (render + features)")
+
+    for preset_id, path in zip(ids, paths):
+        near = ", ".join(f"#{i} ({d:.2f})" for i, d in library.similar_to(preset_id, k=2))
+        print(f"  #{preset_id} {os.path.basename(path):28s} nearest: {near}")
+
+    # queued adds: one worker thread, and the offline renders print nothing
+    before, threads = len(library), threading.active_count()
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        for path in paths:
+            library.add_async(library.get(ids[0])["channels"], "queued")
+        library.flush()
+    ok = len(library) == before + len(paths) and threading.active_count() == threads and not out.getvalue()
+    print(f"add_async: {len(library) - before} stored, {threading.active_count() - threads} extra threads, "
+          f"{len(out.getvalue())} chars printed", "(ok)" if ok else "(FAIL)")
+
+    # pad the index with random vectors to time the search at scale
+    rng = np.random.default_rng(0)
+    fake = rng.random((synthetic, presets.FEATURE_DIM), dtype=np.float32)
+    library.matrix = np.concatenate((library.matrix[:library.count], fake))
+    library.ids = np.concatenate((library.ids, -1 - np.arange(synthetic)))
+    library.count = len(library.ids)
+
+    query = library.matrix[0].copy()
+    runs = 50
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        result = library.nearest(vector=query, k=5)
+    ms = (time.perf_counter() - t0) / runs * 1000
+    print(f"nearest() over {library.count} presets: {ms:.2f} ms, top hit #{result[0][0]}")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Click check for preset changes while a note sounds.
+#
+#   python preset_swap.py
+#
+# Holds a note on the sine channel alone and changes its frequency and volume
+# mid-note, once by writing the parameters directly (the old AI path) and once
+# through Sound.apply_preset(), at several points in the waveform cycle. The
+# largest sample-to-sample step around the change is compared with the
+# largest step of the steady tone just before it: a click shows up as a step
+# far above it. Finally a note_off() between apply_preset() and the swap must
+# still release the new channel.
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from presets import default_sound
+
+SR = 44100
+BLOCK = 512
+SETTLE = 60    # blocks before the change, the envelope is in sustain by then
+TRIALS = 8
+
+def run(atomic, before):
+    sound = default_sound(SR)
+    for ch in (0, 2):
+        sound.params.apply_dict(ch, {"volume": 0.0})
+    new = sound.params.to_dict(1)
+    new["waveform"]["frequency"] = 587.33
+    new["volume"] = 0.6
+    out = []
+    # the envelope prints its state every block
+    with contextlib.redirect_stdout(io.StringIO()):
+        sound.note_on()
+        for _ in range(before):
+            out.append(sound.process(BLOCK))
+        t0 = time.perf_counter()
+        if atomic:
+            sound.apply_preset({1: new})
+        else:
+            sound.params.apply_dict(1, new)
+        prepare = time.perf_counter() - t0
+        for _ in range(20):
+            out.append(sound.process(BLOCK))
+    steps = np.abs(np.diff(np.concatenate(out)))
+    at = before * BLOCK - 1
+    return steps[at - 10 * BLOCK:at].max(), steps[at - 1:].max(), prepare
+
+if __name__ == "__main__":
+    for atomic in (False, True):
+        # worst case over a few positions in the waveform cycle
+        runs = [run(atomic, SETTLE + k) for k in range(TRIALS)]
+        steady = max(r[0] for r in runs)
+        change = max(r[1] for r in runs)
+        prepare = max(r[2] for r in runs)
+        name = "apply_preset()" if atomic else "direct writes "
+        print(f"{name}: max step {change:.3f} around the change vs {steady:.3f} steady "
+              f"({change / steady:.1f}x), {prepare * 1000:.2f} ms on the calling thread")
+
+    sound = default_sound(SR)
+    with contextlib.redirect_stdout(io.StringIO()):
+        sound.note_on()
+        for _ in range(SETTLE):
+            sound.process(BLOCK)
+        sound.apply_preset({1: {"volume": 0.6}})
+        sound.note_off()   # before the next block swaps the channel in
+        for _ in range(100):
+            sound.process(BLOCK)
+    state = sound.channels[1].envelopes[0].state
+    print(f"note_off() before the swap: new channel {state} ({'ok' if state == 'idle' else 'stuck'})")
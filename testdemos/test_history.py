@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# Preset history: background appends, undo/redo, restart and index recovery.
+#
+#   python test_history.py [entries]
+#
+# Works in a temporary directory, seeded from last_preset.json like main.py.
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+from history import PresetHistory
+
+def preset(n):
+    with open(os.path.join(ROOT, "last_preset.json")) as f:
+        channels = json.load(f)["channels"]
+    channels[0]["volume"] = round(n / 1000, 3)
+    return channels
+
+def check(name, ok):
+    print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    return ok
+
+if __name__ == "__main__":
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "history.jsonl")
+    ok = True
+
+    h = PresetHistory(path, seed=os.path.join(ROOT, "last_preset.json"))
+    ok &= check("seeded from last_preset.json", len(h) == 1)
+
+    t0 = time.perf_counter()
+    for n in range(1, entries):
+        h.append(preset(n), f"preset {n}")
+    queued = time.perf_counter() - t0
+    h.flush()
+    written = time.perf_counter() - t0
+    print(f"     {entries - 1} appends: {queued / (entries - 1) * 1e6:.0f} us each on the caller, "
+          f"{written:.2f} s until all written")
+    ok &= check("all entries indexed", len(h) == entries)
+
+    ok &= check("undo", h.undo()["description"] == f"preset {entries - 2}")
+    ok &= check("undo again", h.undo()["description"] == f"preset {entries - 3}")
+    ok &= check("redo", h.redo()["description"] == f"preset {entries - 2}")
+    h.append(preset(0), "branch")
+    ok &= check("append after undo drops the redo branch", h.redo() is None and len(h) == entries)
+
+    t0 = time.perf_counter()
+    for n in range(0, len(h), max(1, len(h) // 100)):
+        h.get(n)
+    print(f"     get(n): {(time.perf_counter() - t0) / 100 * 1e6:.0f} us per lookup")
+
+    t0 = time.perf_counter()
+    h2 = PresetHistory(path)
+    current = h2.current()
+    print(f"     reopen + current(): {(time.perf_counter() - t0) * 1000:.1f} ms")
+    ok &= check("restart restores the current entry", current["description"] == "branch")
+
+    # a crash between the log append and the index rename
+    h2.flush()
+    with open(path, "a") as f:
+        f.write(json.dumps({"time": 0, "description": "unindexed", "channels": []}) + "\n")
+    ok &= check("unindexed tail recovered", PresetHistory(path).current()["description"] == "unindexed")
+
+    os.remove(path + ".idx")
+    ok &= check("index rebuilt from the log", len(PresetHistory(path)) == entries + 2)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# Import-time budget for the synth core, measured with `python -X importtime`.
+#
+#   python test_import_time.py [budget_ms]
+#
+# Imports the modules main.py needs before the first sound, plus the AI
+# modules themselves (which must defer their heavy dependencies), in a fresh
+# interpreter. Fails if the total exceeds the budget or if any AI-only
+# dependency was pulled in.
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+CORE = ["channel", "sound", "params", "knob", "inputbus", "speech", "resample", "vad", "history"]
+DEFERRED = ["reaction", "llmcache", "ai_pipeline"]
+FORBIDDEN = ["openai", "vosk", "scipy", "httpx", "httpx2"]
+DEFAULT_BUDGET_MS = 500
+
+def import_times(modules):
+    """
+    Import `modules` in a fresh interpreter; returns ({module: cumulative ms}
+    for the listed modules, set of every top-level package loaded).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        sys.exit(proc.stderr.strip().splitlines()[-1])
+    times, loaded = {}, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        cumulative, name = line.split("|")[1:]
+        # nested imports are indented under the module that triggered them
+        loaded.add(name.strip().split(".")[0])
+        if name.strip() in modules and name[1:] == name.strip():
+            times[name.strip()] = int(cumulative) / 1000
+    return times, loaded
+
+if __name__ == "__main__":
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    times, loaded = import_times(CORE + DEFERRED)
+    total_ms = sum(times.values())
+    for name, ms in sorted(times.items(), key=lambda kv: -kv[1]):
+        print(f"{ms:8.1f} ms  {name}")
+    print(f"total: {total_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+
+    ok = True
+    bad = [name for name in FORBIDDEN if name in loaded]
+    if bad:
+        print("FAIL: AI-only dependencies imported at startup:", ", ".join(bad))
+        ok = False
+    if total_ms > budget_ms:
+        print("FAIL: import time over budget")
+        ok = False
+    if ok:
+        print("PASS")
+    sys.exit(0 if ok else 1)
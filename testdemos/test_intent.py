@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# Run sample AI-mode requests through the local intent parser and show which
+# ones it handles (and how fast) and which would go to the LLM.
+#
+#   python test_intent.py ["your own phrase" ...]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import intent
+from channel import Waveform, Envelope, Filter, Reverb, Channel
+from sound import Sound
+
+SAMPLES = [
+    "more reverb on the saw", "shorter attack", "set frequency to 220", "I'm done",
+    "a bit louder", "darker", "set the attack to 50 percent", "set reverb decay to 0.8",
+    "set frequency to two hundred twenty hertz", "an octave down on the square",
+    "turn the volume down on sine and square", "longer release", "something similar",
+    "make it sound like a church bell", "warm pad with slow attack", "higher pitch",
+    "set volume to 50",
+]
+
+sound = Sound(sr=44100)
+for name, vol in (("saw", 1.0), ("sin", 0.0), ("sqr", 0.0)):
+    sound.add_channel(Channel(Waveform(name, sr=44100), Envelope(sr=44100), Filter(sr=44100),
+                              Reverb(sr=44100), sr=44100, volume=vol))
+
+phrases = sys.argv[1:] or SAMPLES
+local = 0
+for text in phrases:
+    t0 = time.perf_counter()
+    edit = intent.parse(text)
+    resp = intent.apply(edit, sound) if edit is not None else None
+    ms = (time.perf_counter() - t0) * 1000
+    if resp is None:
+        print(f"{ms:6.2f} ms  {text!r:45} -> LLM")
+    else:
+        local += 1
+        print(f"{ms:6.2f} ms  {text!r:45} -> {resp['description']}")
+print(f"handled locally: {local}/{len(phrases)}")
+
+# a plain number outside the parameter range is not clamped to an end
+edit = intent.parse("set volume to 50")
+print("'set volume to 50' ->", edit, "(ok)" if edit is None else "(FAIL)")
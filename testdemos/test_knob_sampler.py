@@ -0,0 +1,56 @@
+import sys
+import os
+import json
+import time
+import random
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import knob
+
+# Usage:
+#   python test_knob_sampler.py                  replay a synthetic noisy sweep
+#   python test_knob_sampler.py trace.json       replay a recorded trace
+#   python test_knob_sampler.py --record out.json 10
+#                                                record 10 s of P0..P3 from the ADS1115
+
+def record(path, seconds, rate=50.0):
+    backend = knob.ADS1115Backend()
+    traces = {cid: [] for cid in range(knob.NUM_CHANNELS)}
+    end = time.time() + seconds
+    while time.time() < end:
+        for cid in traces:
+            traces[cid].append(backend.read(cid))
+        time.sleep(1.0 / rate)
+    with open(path, "w") as f:
+        json.dump(traces, f)
+    print(f"Recorded {len(traces[0])} scans to {path}")
+
+def synthetic_trace(n=200, noise=0.02):
+    # slow turn from 0.5 V to 2.8 V with ADC noise and a few glitches
+    trace = []
+    for i in range(n):
+        v = 0.5 + 2.3 * min(max((i - 50) / 100, 0.0), 1.0) + random.gauss(0, noise)
+        if random.random() < 0.02:
+            v += random.choice([-1, 1]) * 0.5
+        trace.append(v)
+    return {0: trace}
+
+def replay(backend):
+    sampler = knob.KnobSampler(backend)
+    scans = 0
+    while not backend.finished():
+        sampler.step()
+        scans += 1
+    events = []
+    while not sampler.events.empty():
+        events.append(sampler.events.get())
+    print(f"{scans} scans -> {len(events)} change events")
+    for cid, v, _ in events:
+        print(f"  P{cid}: {v:.3f} V")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--record":
+        record(sys.argv[2], float(sys.argv[3]) if len(sys.argv) > 3 else 10.0)
+    elif len(sys.argv) > 1:
+        replay(knob.MockBackend.from_file(sys.argv[1]))
+    else:
+        replay(knob.MockBackend(synthetic_trace()))
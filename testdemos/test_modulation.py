@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# LFO modulation: tremolo and vibrato on the live render path, and the cost
+# per block as routings are added.
+#
+#   python test_modulation.py
+#
+# A 2 Hz sine LFO on the sine channel's volume should swing the output level
+# by the routed depth; a +-1 semitone square-wave vibrato should put the two
+# halves of its period 2**(2/12) apart in pitch (measured from zero
+# crossings). route() must reject a channel that does not exist, and LFOs
+# added from another thread while blocks render must not break the render.
+# Then 8 LFOs drive up to 192 routings over all channels and targets, at two
+# control rates.
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from modulation import ModMatrix, SHAPES, TARGETS
+from presets import default_sound
+
+SR = 44100
+BLOCK = 512
+
+def sine_only():
+    sound = default_sound(SR)
+    for ch in (0, 2):
+        sound.params.apply_dict(ch, {"volume": 0.0})
+    sound.params.apply_dict(1, {"volume": 0.5,
+                                "envelope": {"attack_time": 0.0, "sustain_level": 1.0, "decay_time": 0.0},
+                                "reverb": {"wet": 0.0}})
+    sound.modulation = ModMatrix(sound)
+    return sound
+
+def render(sound, seconds):
+    out = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        sound.note_on()
+        for _ in range(int(SR * seconds) // BLOCK):
+            out.append(sound.process(BLOCK))
+    return np.concatenate(out)
+
+if __name__ == "__main__":
+    sound = sine_only()
+    mod = sound.modulation
+    mod.route(mod.add_lfo(2.0), 1, "vol", 0.25)
+    sig = render(sound, 1.0)
+    seg = SR // 100
+    rms = np.sqrt(np.mean(sig[:len(sig) // seg * seg].reshape(-1, seg) ** 2, axis=1)) * np.sqrt(2)
+    print(f"tremolo: level {rms[2:].min():.3f} .. {rms[2:].max():.3f} (expected 0.250 .. 0.750)")
+
+    sound = sine_only()
+    mod = sound.modulation
+    mod.route(mod.add_lfo(0.5, "square"), 1, "pitch", 1.0)
+    sig = render(sound, 2.0)
+    half = len(sig) // 2
+    crossings = lambda x: np.count_nonzero(np.diff(np.signbit(x)))
+    ratio = crossings(sig[:half]) / crossings(sig[half:])
+    print(f"vibrato: pitch ratio {ratio:.4f} (expected {2 ** (2 / 12):.4f})")
+
+    try:
+        mod.route(0, len(sound.channels), "vol", 0.1)
+        print("bad channel: accepted (FAIL)")
+    except ValueError as e:
+        print(f"bad channel: rejected by route() ({e})")
+
+    # LFOs and routings added from another thread while blocks render
+    sound = sine_only()
+    mod = sound.modulation
+    def edit():
+        for k in range(300):
+            mod.route(mod.add_lfo(1.0 + k % 7), k % 3, TARGETS[k % len(TARGETS)], 0.001)
+    editor = threading.Thread(target=edit)
+    with contextlib.redirect_stdout(io.StringIO()):
+        sound.note_on()
+        editor.start()
+        while editor.is_alive():
+            sound.process(BLOCK)
+        sound.process(BLOCK)
+    print(f"concurrent edits: {len(mod.lfos[0])} LFOs, {len(mod._phases)} phases advanced, no errors")
+
+    runs = 200
+    for rate in (200.0, 1000.0):
+        for n_routes in (1, 24, 192):
+            mod = ModMatrix(sound, control_rate=rate)
+            for k in range(8):
+                mod.add_lfo(0.1 + k, SHAPES[k % len(SHAPES)])
+            for r in range(n_routes):
+                mod.route(r % 8, r % 3, TARGETS[(r // 3) % len(TARGETS)], 0.01)
+            t0 = time.perf_counter()
+            for _ in range(runs):
+                mod.render(sound, BLOCK, {})
+            per_block = (time.perf_counter() - t0) / runs
+            print(f"{rate:6.0f} Hz control rate, {n_routes:3d} routings: {per_block * 1e6:5.0f} us per "
+                  f"{BLOCK}-sample block ({per_block / (BLOCK / SR):.1%} of the block time)")
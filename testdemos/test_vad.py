@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Run the VAD over synthesized signals and check onset, end and clipped speech.
+#
+#   python test_vad.py
+#
+# Each case is 4.5 s of audio with vowel-like speech from SPEECH[0] to
+# SPEECH[1]: in a quiet room, in room noise just under the minimum threshold
+# (the threshold must rise above it), with speech already under way when the
+# stream opens, and with a steady tone playing from the start. Speech must be
+# detected without clipping its start, and must end after the hangover.
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from vad import VoiceActivityDetector
+
+SR = 44100
+BLOCK = int(SR * 0.03)
+HANGOVER = 1.0
+MIN_THRESHOLD = 0.01
+SPEECH = (1.0, 2.5)
+
+def synthetic(noise=0.0, speech=SPEECH, tone=0.0, sr=SR, seed=0):
+    t = np.arange(int(sr * 4.5)) / sr
+    f0 = 120 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voice = 0.1 * sum(np.sin(k * phase) / k for k in range(1, 20))
+    voice *= (t >= speech[0]) & (t < speech[1])
+    hum = tone * np.sin(2 * np.pi * 1000 * t) * (t < SPEECH[0])
+    rng = np.random.default_rng(seed)
+    return (voice + hum + noise * rng.standard_normal(len(t))).astype(np.float32)
+
+def run(audio, sr=SR):
+    """(first kept sample time, detection time, end time, final threshold); None when not reached."""
+    vad = VoiceActivityDetector(sr, min_threshold=MIN_THRESHOLD, hangover=HANGOVER)
+    kept_from = detected = end = None
+    for i in range(0, len(audio), BLOCK):
+        kept = vad.process(audio[i:i + BLOCK])
+        if kept is not None and detected is None:
+            detected = (i + BLOCK) / sr
+            kept_from = (i + BLOCK - len(kept)) / sr
+        if vad.ended:
+            end = (i + BLOCK) / sr
+            break
+    return kept_from, detected, end, vad.threshold
+
+def check(name, ok):
+    print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    return ok
+
+if __name__ == "__main__":
+    # (name, audio, speech start, speech end)
+    cases = [
+        ("quiet room", synthetic(0.002), *SPEECH),
+        ("noise under the minimum threshold", synthetic(0.006), *SPEECH),
+        ("speech when the stream opens", synthetic(0.002, speech=(0.0, 1.5)), 0.0, 1.5),
+        ("tone when the stream opens", synthetic(0.002, tone=0.05), 0.0, SPEECH[1]),
+    ]
+    ok = True
+    for name, audio, start, stop in cases:
+        kept_from, detected, end, threshold = run(audio)
+        print(f"--- {name}: detected at {detected} s (audio kept from {kept_from} s), "
+              f"ended at {end} s, threshold {threshold:.4f}")
+        ok &= check("speech detected within 0.1 s of its start",
+                    detected is not None and start <= detected <= start + 0.1 + BLOCK / SR)
+        ok &= check("start of speech kept", kept_from is not None and kept_from <= start)
+        ok &= check("ended after the hangover",
+                    end is not None and stop + HANGOVER <= end <= stop + HANGOVER + 0.1)
+
+    _, _, _, threshold = run(synthetic(0.006))
+    ok &= check("threshold rose above the room noise", threshold > MIN_THRESHOLD)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,110 @@
+import numpy as np
+
+class VoiceActivityDetector:
+    """
+    Block-wise voice activity detector shared by the STT backends.
+
+    Each block is split into short frames and their RMS computed in one
+    vectorized pass. Frames are voiced when they exceed
+    max(min_threshold, ratio * noise_floor); the noise floor starts at
+    min_threshold / ratio and follows the unvoiced frames, so the threshold
+    rises in noisy rooms. Speech starts after `onset_frames` voiced frames in
+    a row and ends after `hangover` seconds without a voiced frame.
+
+    While waiting, blocks go into a fixed-size pre-roll ring buffer; on onset
+    the ring is returned ahead of the current block so the first syllable
+    is not clipped.
+    """
+    def __init__(self, samplerate, min_threshold=0.01, ratio=3.0, frame_ms=10,
+                 onset_frames=3, hangover=1.0, pre_roll=0.3, floor_alpha=0.1):
+        self.samplerate = samplerate
+        self.min_threshold = min_threshold
+        self.ratio = ratio
+        self.frame_len = max(1, int(samplerate * frame_ms / 1000))
+        self.onset_frames = onset_frames
+        self.hangover = int(hangover * samplerate)
+        self.floor_alpha = floor_alpha
+        self.ring = np.zeros(max(1, int(pre_roll * samplerate)), dtype=np.float32)
+        # seeded low, so sound already present when the stream opens is not
+        # taken for the floor
+        self.noise_floor = min_threshold / ratio
+        self.reset()
+
+    def reset(self):
+        """Prepare for the next utterance; the noise floor estimate is kept."""
+        self.in_speech = False
+        self.ended = False
+        self.voiced_run = 0
+        self.silent_samples = 0
+        self.ring_pos = 0
+        self.ring_fill = 0
+
+    @property
+    def threshold(self):
+        return max(self.min_threshold, self.ratio * self.noise_floor)
+
+    def _frame_rms(self, block):
+        n = len(block) // self.frame_len * self.frame_len
+        if n == 0:
+            return np.sqrt(np.mean(block ** 2, keepdims=True))
+        frames = block[:n].reshape(-1, self.frame_len)
+        return np.sqrt(np.mean(frames ** 2, axis=1))
+
+    def _push_ring(self, block):
+        size = len(self.ring)
+        block = block[-size:]
+        idx = (self.ring_pos + np.arange(len(block))) % size
+        self.ring[idx] = block
+        self.ring_pos = (self.ring_pos + len(block)) % size
+        self.ring_fill = min(size, self.ring_fill + len(block))
+
+    def _pop_ring(self):
+        size = len(self.ring)
+        start = (self.ring_pos - self.ring_fill) % size
+        out = self.ring[(start + np.arange(self.ring_fill)) % size]
+        self.ring_fill = 0
+        return out
+
+    def process(self, block):
+        """
+        Feed one mono float block. Returns the audio to keep for the utterance
+        (pre-roll + block at onset, the block while speaking) or None.
+        `ended` becomes True once the hangover has elapsed after speech.
+        """
+        block = np.asarray(block, dtype=np.float32).reshape(-1)
+        rms = self._frame_rms(block)
+        voiced = rms > self.threshold
+
+        # noise floor follows the unvoiced frames
+        if not voiced.all():
+            self.noise_floor += self.floor_alpha * (float(np.median(rms[~voiced])) - self.noise_floor)
+
+        # voiced frames in a row, carried across blocks
+        if voiced.all():
+            longest = self.voiced_run + len(voiced)
+            self.voiced_run = longest
+        else:
+            leading = int(np.argmax(~voiced))
+            inner = 0
+            if len(voiced) >= self.onset_frames:
+                inner = int(np.convolve(voiced, np.ones(self.onset_frames, dtype=int), 'valid').max())
+            longest = max(self.voiced_run + leading, inner)
+            self.voiced_run = int(np.argmax(~voiced[::-1]))
+
+        if not self.in_speech:
+            if longest >= self.onset_frames:
+                self.in_speech = True
+                self.silent_samples = 0
+                return np.concatenate((self._pop_ring(), block))
+            self._push_ring(block)
+            return None
+
+        if voiced.any():
+            # samples since the last voiced frame
+            last = len(voiced) - 1 - int(np.argmax(voiced[::-1]))
+            self.silent_samples = len(block) - (last + 1) * self.frame_len
+        else:
+            self.silent_samples += len(block)
+        if self.silent_samples >= self.hangover:
+            self.ended = True
+        return block
@@ -2,6 +2,7 @@ import math
 import pygame, pigame
 from pygame.locals import *
 from sound import *
+from params import PARAMS
 import time
 import random
 import colorsys
@@ -20,45 +21,23 @@ COLOR_MAP = {
     'sqr': SQR_COLOR
 }
 
-# Draw parameter text positions
+# Draw parameter text positions, columns per waveform and rows from the registry
+WAVE_COLUMNS = {'saw': 2, 'sin': 3, 'sqr': 4}
+PARAM_ROWS = {p.key: p.row for p in PARAMS}
+
 def get_param_text_center(wave_name, param_name):
-    x = None
-    y = None
-    if wave_name == 'saw':
-        x = width // 9 * 2
-    elif wave_name == 'sin':
-        x = width // 9 * 3
-    elif wave_name == 'sqr':
-        x = width // 9 * 4
-    else:
+    if wave_name not in WAVE_COLUMNS:
         raise ValueError("Invalid wave name")
-
-    if param_name == 'vol':
-        y = height // 16 * 2
-    elif param_name == 'att':
-        y = height // 16 * 4
-    elif param_name == 'dec':
-        y = height // 16 * 5
-    elif param_name == 'sus':
-        y = height // 16 * 6
-    elif param_name == 'rel':
-        y = height // 16 * 7
-    elif param_name == 'L':
-        y = height // 16 * 9
-    elif param_name == 'M':
-        y = height // 16 * 10
-    elif param_name == 'H':
-        y = height // 16 * 11
-    elif param_name == 'dec2':
-        y = height // 16 * 13
-    elif param_name == 'del':
-        y = height // 16 * 14
-    elif param_name == 'wet':
-        y = height // 16 * 15
-    else:
+    if param_name not in PARAM_ROWS:
         raise ValueError("Invalid parameter name")
+    return (width // 9 * WAVE_COLUMNS[wave_name], height // 16 * PARAM_ROWS[param_name])
 
-    return (x, y)
+def get_param_cell_rect(wave_name, param_name):
+    """Screen rect covering one parameter value cell (and its selection box)."""
+    cell_w = width // 9 + 3
+    cell_h = height // 16 + 2
+    x, y = get_param_text_center(wave_name, param_name)
+    return pygame.Rect(x - cell_w // 2, y - cell_h // 2, cell_w, cell_h)
 
 def draw_param(screen, wave_name, param_name, value, font, radius=5, zoom=False):
     if zoom:
@@ -102,19 +81,11 @@ def draw_param_ring(screen, wave_name, param_name, value, font, radius=11):
     screen.blit(knob_surf, knob_surf.get_rect(center=center))
 
 def draw_params(screen, font, sound):
-    for channel in sound.channels:
+    bank = sound.params
+    for ch, channel in enumerate(sound.channels):
         wn = channel.waveform.name
-        draw_param(screen, wn, 'vol' , channel.volume               , font)
-        draw_param(screen, wn, 'att' , channel.envelopes[0].attack_time , font)
-        draw_param(screen, wn, 'dec' , channel.envelopes[0].decay_time  , font)
-        draw_param(screen, wn, 'sus' , channel.envelopes[0].sustain_level, font)
-        draw_param(screen, wn, 'rel' , channel.envelopes[0].release_time , font)
-        draw_param(screen, wn, 'L'   , channel.filters[0].low        , font)
-        draw_param(screen, wn, 'M'   , channel.filters[0].mid        , font)
-        draw_param(screen, wn, 'H'   , channel.filters[0].high       , font)
-        draw_param(screen, wn, 'dec2', channel.reverbs[0].decay      , font)
-        draw_param(screen, wn, 'del' , channel.reverbs[0].delay      , font)
-        draw_param(screen, wn, 'wet' , channel.reverbs[0].wet        , font)
+        for i, spec in enumerate(PARAMS):
+            draw_param(screen, wn, spec.key, bank.get(ch, i), font)
 
 def draw_texts(screen, font):
     # static labels, always white
@@ -126,19 +97,15 @@ def draw_texts(screen, font):
     screen.blit(text_sqr, text_sqr.get_rect(center=(width // 9 * 4, height // 16)))
 
     # parameter names, always white
-    for name, y_mul in [('VOL',2),('ATT',4),('DEC',5),('SUS',6),('REL',7),
-                        ('L',9),('M',10),('H',11),('DEC',13),('DEL',14),('WET',15)]:
-        txt = font.render(name, True, white)
-        screen.blit(txt, txt.get_rect(center=(width//9*1, height//16*y_mul)))
+    for spec in PARAMS:
+        txt = font.render(spec.label, True, white)
+        screen.blit(txt, txt.get_rect(center=(width//9*1, height//16*spec.row)))
 
 def draw_box(screen, wave_name, param_name):
-    box_width  = width // 9 + 3
-    box_height = height // 16 + 2
-    pos = get_param_text_center(wave_name, param_name)
-    pos = (pos[0] - box_width//2, pos[1] - box_height//2)
-    surf = pygame.Surface((box_width, box_height), pygame.SRCALPHA)
-    pygame.draw.rect(surf, white, (0,0,box_width,box_height), 1)
-    screen.blit(surf, pos)
+    rect = get_param_cell_rect(wave_name, param_name)
+    surf = pygame.Surface(rect.size, pygame.SRCALPHA)
+    pygame.draw.rect(surf, white, (0,0,rect.width,rect.height), 1)
+    screen.blit(surf, rect.topleft)
 
 # preview panels layout
 OUTER_MARGIN = 5
@@ -251,6 +218,36 @@ def draw_screen(screen, font, sound, wave_name, param_name):
     draw_filter_preview(screen, sound, wave_name)
     pygame.display.update()
 
+def draw_changes(screen, font, sound, changes, wave_name, param_name):
+    """
+    Partial redraw for a set of changed (channel, param index) pairs:
+    only the touched value cells and affected previews are repainted and flipped.
+    """
+    regions = _compute_panel_regions()
+    dirty_rects = []
+    previews = set()
+    for ch, i in changes:
+        spec = PARAMS[i]
+        wn = sound.channels[ch].waveform.name
+        rect = get_param_cell_rect(wn, spec.key)
+        screen.fill(black, rect)
+        draw_param(screen, wn, spec.key, sound.params.get(ch, i), font)
+        if wn == wave_name and spec.key == param_name:
+            draw_box(screen, wave_name, param_name)
+        dirty_rects.append(rect)
+        if wn == wave_name and spec.section in ('envelope', 'filter'):
+            previews.add(spec.section)
+    if 'envelope' in previews:
+        screen.fill(black, regions[1])
+        draw_envelope_preview(screen, sound, wave_name)
+        dirty_rects.append(pygame.Rect(regions[1]))
+    if 'filter' in previews:
+        screen.fill(black, regions[2])
+        draw_filter_preview(screen, sound, wave_name)
+        dirty_rects.append(pygame.Rect(regions[2]))
+    if dirty_rects:
+        pygame.display.update(dirty_rects)
+
 
 class Particle:
     def __init__(self, x, y, vx, vy, life, size, hue):
@@ -330,8 +327,8 @@ def draw_AI_interface(screen, font, AI_state):
     screen.blit(glow, (0, 0))
 
     # spawn & update particles
-    if AI_state == "reasoning":
-        # --- reasoning: draw a static ring with rotating points + ambient particles ---
+    if AI_state in ("reasoning", "loading"):
+        # --- reasoning (or waiting for the speech model): draw a static ring with rotating points + ambient particles ---
         cx, cy = width // 2, height // 2
         const_radius = 45  # fixed radius for reasoning state
 
@@ -378,8 +375,8 @@ def draw_AI_interface(screen, font, AI_state):
             if p.life <= 0:
                 draw_AI_interface._reason_particles.remove(p)
 
-        # render centered "Thinking..." text
-        txt = font.render("Thinking...", True, white)
+        # render centered "Thinking..." / "Loading..." text
+        txt = font.render("Loading..." if AI_state == "loading" else "Thinking...", True, white)
         screen.blit(txt, txt.get_rect(center=(cx, cy)))
 
         pygame.display.update()
@@ -0,0 +1,57 @@
+from params import PARAMS, WAVE_NAMES
+
+# Spoken vocabulary of the synth, shared by the constrained speech recognizer
+# and the local intent parser.
+
+# spoken word -> WAVE_NAMES entry
+WAVE_WORDS = {
+    "saw": "saw", "sawtooth": "saw",
+    "sine": "sin", "sin": "sin",
+    "square": "sqr", "pulse": "sqr",
+}
+
+# spoken word -> PARAMS key ("decay" means the envelope unless said with "reverb")
+PARAM_WORDS = {
+    "volume": "vol", "level": "vol", "gain": "vol",
+    "attack": "att",
+    "decay": "dec",
+    "sustain": "sus",
+    "release": "rel",
+    "bass": "L", "low": "L", "lows": "L",
+    "mid": "M", "mids": "M", "middle": "M",
+    "treble": "H", "high": "H", "highs": "H",
+    "tail": "dec2",
+    "delay": "del", "predelay": "del",
+    "reverb": "wet", "wet": "wet", "room": "wet", "echo": "wet",
+}
+
+COMMAND_WORDS = (
+    "set", "make", "change", "put", "turn", "to", "at", "by", "the", "a", "it", "its",
+    "on", "of", "for", "and", "all", "every", "channel", "channels", "wave", "waveform",
+    "more", "less", "much", "bit", "little", "lot", "up", "down", "increase", "decrease",
+    "raise", "lower", "add", "reduce", "louder", "quieter", "softer",
+    "brighter", "darker", "duller", "warmer", "shorter", "longer", "faster", "slower",
+    "frequency", "pitch", "hertz", "percent", "point", "octave",
+    "exit", "quit", "done", "stop", "finished", "goodbye", "that's", "i'm",
+    "undo", "redo", "back", "go", "previous",
+    "similar", "another", "something", "this", "give", "me", "try",
+)
+
+NUMBER_WORDS = (
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine",
+    "ten", "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen",
+    "seventeen", "eighteen", "nineteen", "twenty", "thirty", "forty", "fifty",
+    "sixty", "seventy", "eighty", "ninety", "hundred", "thousand", "half",
+)
+
+def synth_words():
+    """Every word the synth understands: registry labels, synonyms, commands, numbers."""
+    words = set(WAVE_WORDS) | set(PARAM_WORDS) | set(COMMAND_WORDS) | set(NUMBER_WORDS)
+    words.update(name for name in WAVE_NAMES)
+    words.update(spec.field.split("_")[0] for spec in PARAMS)
+    words.update(spec.section for spec in PARAMS if spec.section)
+    return sorted(words)
+
+def recognizer_grammar():
+    """Vosk grammar: any sequence of synth words, anything else as [unk]."""
+    return synth_words() + ["[unk]"]